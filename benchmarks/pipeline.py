@@ -0,0 +1,235 @@
+"""
+Micro-benchmarks for the tracking and reasoning pipeline.
+
+Times EventReader.read_recent against log size (cold start, tailing and a
+full scan), cleanup_old_logs, window aggregation, prompt building, a full
+LLMReasoner assessment with a mock client, and EventServer ingest through
+the Flask test client. Inputs are synthetic and seeded.
+
+Results are written as JSON keyed by benchmark name, so two runs can be
+compared:
+
+    python benchmarks/pipeline.py --output before.json
+    git checkout my-branch
+    python benchmarks/pipeline.py --output after.json --compare before.json
+
+It runs as a script or as ``python -m benchmarks.pipeline`` from the repo
+root; either way this directory is put on ``sys.path`` so ``synthetic``
+imports the same way.
+"""
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from synthetic import MockLLMClient, generate_events, write_log
+
+from drift_watcher.llm import LLMReasoner, PromptBuilder
+from drift_watcher.tracking import ActivityProcessor, EventReader, SlidingWindowAggregator
+from drift_watcher.tracking.server import EventServer
+
+
+def measure(fn, repeat, setup=None):
+    """Run fn ``repeat`` times (after setup, untimed) and summarize in ms."""
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+    }
+
+
+def bench_reader(results, workdir, args):
+    for size in args.log_sizes:
+        log = workdir / f"events-{size}.log"
+        write_log(log, size, args.window_events, url_cardinality=args.urls,
+                  content_chars=args.content_chars, seed=args.seed)
+
+        results[f"read_recent.cold[events={size}]"] = measure(
+            lambda: EventReader(log).read_recent(args.window_seconds), args.repeat
+        )
+        results[f"read_recent.full_scan[events={size}]"] = measure(
+            lambda: EventReader(log, tail=False).read_recent(args.window_seconds), args.repeat
+        )
+
+        # Tailing: each call only sees a few freshly appended events
+        reader = EventReader(log)
+        reader.read_recent(args.window_seconds)
+
+        def append():
+            now = int(time.time() * 1000)
+            with open(log, "a") as f:
+                for event in generate_events(10, now - 1000, now, args.urls, args.content_chars, args.seed):
+                    f.write(json.dumps(event) + "\n")
+
+        results[f"read_recent.tail[events={size}]"] = measure(
+            lambda: reader.read_recent(args.window_seconds), args.repeat, setup=append
+        )
+
+        work = workdir / f"cleanup-{size}.log"
+        results[f"cleanup_old_logs[events={size}]"] = measure(
+            lambda: EventReader(work, max_age_days=7).cleanup_old_logs(),
+            args.repeat, setup=lambda: shutil.copyfile(log, work)
+        )
+
+
+def bench_aggregate(results, args):
+    now = int(time.time() * 1000)
+    window = generate_events(args.window_events, now - args.window_seconds * 1000, now,
+                             args.urls, args.content_chars, args.seed)
+    results[f"aggregate.batch[events={len(window)}]"] = measure(
+        lambda: ActivityProcessor().aggregate(window), args.repeat
+    )
+
+    aggregator = SlidingWindowAggregator(args.window_seconds)
+    aggregator.aggregate(window)
+    fresh = []
+
+    def slide():
+        # Ten new events arrive between ticks
+        latest = fresh[-1]["server_ts"] if fresh else now
+        fresh[:] = generate_events(10, latest + 1, latest + 1000, args.urls, args.content_chars, args.seed)
+        window.extend(fresh)
+
+    results[f"aggregate.sliding[events={len(window)}]"] = measure(
+        lambda: aggregator.aggregate(window), args.repeat, setup=slide
+    )
+
+
+def bench_reasoning(results, args):
+    now = int(time.time() * 1000)
+    pages = []
+    for event in generate_events(args.pages * 4, now - 60000, now, args.pages, args.content_chars, args.seed):
+        pages.append({"title": event["title"], "url": event["url"], "content": event["content"],
+                      "duration_min": round(event["durationMs"] / 60000, 2)})
+    goal = "Learn Rust ownership and borrowing"
+    builder = PromptBuilder()
+    template = LLMReasoner.FOCUS_ASSESSMENT_PROMPT
+
+    results[f"prompt.merge_pages[pages={len(pages)}]"] = measure(lambda: builder.merge_pages(pages), args.repeat)
+    merged = builder.merge_pages(pages)
+    results[f"prompt.build[pages={len(merged)}]"] = measure(lambda: builder.build(template, goal, merged), args.repeat)
+
+    reasoner = LLMReasoner(client=MockLLMClient(latency_ms=args.llm_latency_ms))
+    summary = {"pages": pages}
+    results[f"reasoner.assess[pages={len(pages)}]"] = measure(
+        lambda: reasoner.assess_focus_state(goal, summary), args.repeat
+    )
+
+
+def bench_server(results, workdir, args):
+    now = int(time.time() * 1000)
+    events = generate_events(args.batch_size, now, now + 1000, args.urls, args.content_chars, args.seed)
+    for durability in ("none", "always"):
+        server = EventServer(str(workdir / f"ingest-{durability}.log"), durability=durability)
+        client = server.app.test_client()
+        body = json.dumps(events)
+        try:
+            results[f"server.ingest.event[durability={durability}]"] = measure(
+                lambda: client.post("/event", json=events[0]), args.repeat
+            )
+            results[f"server.ingest.batch[durability={durability},events={len(events)}]"] = measure(
+                lambda: client.post("/events", data=body, content_type="application/json"), args.repeat
+            )
+        finally:
+            server.writer.close()
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_file, threshold):
+    """Print median ratios against a previous run; return the regressed benchmarks."""
+    baseline = json.loads(Path(baseline_file).read_text())["results"]
+    regressed = []
+    print(f"{'benchmark':<55} {'before':>10} {'after':>10} {'ratio':>7}", file=sys.stderr)
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["median_ms"], result["median_ms"]
+        ratio = after / before if before else float("inf")
+        flag = "  ⚠️" if ratio > threshold else ""
+        print(f"{name:<55} {before:>10.3f} {after:>10.3f} {ratio:>7.2f}{flag}", file=sys.stderr)
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tracking and reasoning pipeline")
+    parser.add_argument("--log-sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--window-events", type=int, default=200)
+    parser.add_argument("--window-seconds", type=int, default=3600)
+    parser.add_argument("--urls", type=int, default=200, help="URL cardinality")
+    parser.add_argument("--content-chars", type=int, default=300)
+    parser.add_argument("--pages", type=int, default=40, help="distinct pages in the prompt benchmarks")
+    parser.add_argument("--batch-size", type=int, default=50, help="events per POST /events")
+    parser.add_argument("--llm-latency-ms", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=["reader", "aggregate", "reasoning", "server"])
+    parser.add_argument("--output", help="write results JSON here (default: stdout)")
+    parser.add_argument("--compare", help="previous results JSON to compare medians against")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="with --compare, exit 1 if a median grew by more than this factor")
+    args = parser.parse_args()
+
+    groups = set(args.only or ["reader", "aggregate", "reasoning", "server"])
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        if "reader" in groups:
+            bench_reader(results, workdir, args)
+        if "aggregate" in groups:
+            bench_aggregate(results, args)
+        if "reasoning" in groups:
+            bench_reasoning(results, args)
+        if "server" in groups:
+            bench_server(results, workdir, args)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": int(time.time()),
+            "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Ingest latency benchmark: Flask vs async server mode.
+
+Starts the event server in a scratch directory for each mode, fires bursts
+of concurrent POST /event requests (the pattern SPA URL-change storms
+produce) and reports p50/p99 latency and throughput as JSON.
+
+    python benchmarks/server_latency.py --requests 2000 --concurrency 32
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(workdir, mode, port, durability):
+    config = {
+        "llm": {"provider": "ollama"},
+        "agent": {"window_seconds": 30, "drift_confidence_threshold": 0.7},
+        "server": {"host": "127.0.0.1", "port": port, "mode": mode, "durability": durability},
+    }
+    (workdir / "config.json").write_text(json.dumps(config))
+    process = subprocess.Popen(
+        [sys.executable, "-c", "from drift_watcher.tracking.server import main; main()"],
+        cwd=str(workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{url}/health", timeout=0.5)
+            return process, url
+        except requests.RequestException:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{mode} server did not start")
+
+
+def run_load(url, total, concurrency):
+    event = {
+        "type": "PAGE_SESSION",
+        "title": "Benchmark page",
+        "url": "https://example.com/watch?v=abc",
+        "content": "x" * 500,
+        "durationMs": 5000,
+    }
+    local = threading.local()
+
+    def one(_):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        session = local.session
+        started = time.perf_counter()
+        response = session.post(f"{url}/event", json=event, timeout=10)
+        response.raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare ingest latency of the Flask and async servers")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--durability", default="always", choices=["always", "interval", "none"])
+    parser.add_argument("--modes", nargs="+", default=["flask", "async"])
+    parser.add_argument("--port", type=int, default=3399)
+    args = parser.parse_args()
+
+    results = []
+    for offset, mode in enumerate(args.modes):
+        with tempfile.TemporaryDirectory() as tmp:
+            process, url = start_server(Path(tmp), mode, args.port + offset, args.durability)
+            try:
+                run_load(url, min(200, args.requests), args.concurrency)  # warm-up
+                latencies, elapsed = run_load(url, args.requests, args.concurrency)
+            finally:
+                process.terminate()
+                process.wait(timeout=5)
+        results.append({
+            "mode": mode,
+            "durability": args.durability,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "mean_ms": round(statistics.mean(latencies), 2),
+            "throughput_rps": round(args.requests / elapsed, 1),
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
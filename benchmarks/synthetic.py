@@ -0,0 +1,98 @@
+"""
+Synthetic inputs for the benchmarks: browser events, event logs and a
+deterministic LLM client. Everything is seeded, so two runs (or two
+commits) benchmark exactly the same data.
+"""
+import hashlib
+import json
+import random
+import string
+import time
+
+from drift_watcher.llm import BaseLLMClient
+
+
+DOMAINS = (
+    "github.com", "docs.python.org", "stackoverflow.com", "youtube.com", "reddit.com",
+    "news.ycombinator.com", "en.wikipedia.org", "twitter.com", "medium.com", "arxiv.org",
+)
+
+
+def url_pool(cardinality, seed=0):
+    """``cardinality`` distinct page URLs spread over a few domains."""
+    rng = random.Random(seed)
+    urls = []
+    for i in range(cardinality):
+        domain = DOMAINS[i % len(DOMAINS)]
+        path = "/".join(rng.choice(("docs", "watch", "r", "wiki", "issues", "blog")) for _ in range(2))
+        urls.append(f"https://{domain}/{path}/{i}?utm_source=bench&t={rng.randint(0, 600)}")
+    return urls
+
+
+def generate_events(count, start_ts, end_ts, url_cardinality=200, content_chars=300, seed=0):
+    """``count`` PAGE_SESSION events evenly stamped over [start_ts, end_ts) (ms)."""
+    rng = random.Random(seed)
+    urls = url_pool(url_cardinality, seed)
+    letters = string.ascii_lowercase + " " * 6
+    step = (end_ts - start_ts) / max(count, 1)
+    events = []
+    for i in range(count):
+        url = urls[int(rng.paretovariate(1.2)) % len(urls)]
+        events.append({
+            "type": "PAGE_SESSION",
+            "title": f"Page {url.rsplit('/', 1)[-1].split('?')[0]}",
+            "url": url,
+            "content": "".join(rng.choice(letters) for _ in range(content_chars)),
+            "durationMs": rng.randint(2000, 120000),
+            "server_ts": int(start_ts + i * step),
+        })
+    return events
+
+
+def write_log(path, total_events, window_events, window_seconds=600, span_days=14,
+              url_cardinality=200, content_chars=300, seed=0):
+    """Write a JSONL event log ending now.
+
+    ``window_events`` are packed into the last ``window_seconds``; the rest
+    are spread over the ``span_days`` before that, so half of a 14-day log
+    is past a 7-day retention.
+    """
+    now = int(time.time() * 1000)
+    window_start = now - window_seconds * 1000
+    old = generate_events(
+        total_events - window_events, window_start - span_days * 86400 * 1000, window_start,
+        url_cardinality, content_chars, seed
+    )
+    recent = generate_events(window_events, window_start, now, url_cardinality, content_chars, seed + 1)
+    with open(path, "w") as f:
+        for event in old + recent:
+            f.write(json.dumps(event) + "\n")
+    return recent
+
+
+class MockLLMClient(BaseLLMClient):
+    """Deterministic stand-in for an LLM: the verdict is derived from the prompt hash."""
+
+    def __init__(self, latency_ms=0):
+        self.latency_ms = latency_ms
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "Mock"
+
+    def invoke(self, prompt, max_tokens=200, temperature=0.2):
+        self.calls += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        digest = int(hashlib.sha1(prompt.encode()).hexdigest(), 16)
+        focused = digest % 2 == 0
+        relevant = 70.0 if focused else 30.0
+        return {
+            "state": "FOCUSED" if focused else "DRIFTING",
+            "confidence": 0.8,
+            "reason": "mock verdict",
+            "relevant_percent": relevant,
+            "irrelevant_percent": 100 - relevant,
+            "relevant_pages": [1],
+        }
@@ -65,6 +65,12 @@ def main():
         default=None,
         help="Path to config file (default: ~/.drift-watcher/config.json)"
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Run only this profile from the config's 'profiles' list"
+    )
     parser.add_argument(
         "--test-notification",
         action="store_true",
@@ -149,7 +155,7 @@ def main():
     try:
         # Run agent
         from .core.agent import run_agent_loop
-        run_agent_loop(config_file=args.config, goal=args.goal)
+        run_agent_loop(config_file=args.config, goal=args.goal, profile=args.profile)
     except KeyboardInterrupt:
         cleanup()
     except Exception as e:
@@ -180,6 +186,12 @@ def server():
         default=3333,
         help="Server port (default: 3333)"
     )
+    parser.add_argument(
+        "--mode",
+        choices=["flask", "async"],
+        default=None,
+        help="Server implementation: flask, or async (asyncio/aiohttp) (default: server.mode in config, else flask)"
+    )
     
     args = parser.parse_args()
     
@@ -191,13 +203,15 @@ def server():
     # Change to data directory for events.log
     os.chdir(get_data_dir())
     
+    # Storage, durability and mode settings come from the config when there is one
+    config = None
+    if Path(args.config).exists():
+        from .config import Config
+        config = Config(args.config)
+    
     # Run server
-    from .tracking.server import EventServer
-    server = EventServer(
-        events_file="events.log",
-        host=args.host,
-        port=args.port
-    )
+    from .tracking.server import build_server
+    server = build_server(config, host=args.host, port=args.port, mode=args.mode)
     print(f"🌐 Event server starting on {args.host}:{args.port}")
     print(f"📁 Data directory: {get_data_dir()}")
     server.run()
@@ -213,18 +227,42 @@ def manage_goal():
         type=str,
         help="Set a new goal"
     )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Profile whose goal to show or set"
+    )
     
     args = parser.parse_args()
     
     data_dir = get_data_dir()
     os.chdir(data_dir)
     
-    from .core.state_manager import StateManager
+    from .core.state_manager import StateManager, build_state_manager
     
     state_manager = StateManager()
+    events_log, relevance_cache = "events.log", "relevance_cache.json"
+    if Path("config.json").exists():
+        from .config import Config
+        config = Config("config.json")
+        if args.profile:
+            config = config.profile(args.profile)
+            Path(config.state_file).parent.mkdir(parents=True, exist_ok=True)
+        state_manager = build_state_manager(
+            config.state_backend, config.state_file, config.history_file, config.state_db
+        )
+        events_log, relevance_cache = config.events_path, config.relevance_cache_file
+    elif args.profile:
+        print("❌ --profile needs a config.json with a 'profiles' list")
+        return
     
     if args.set:
-        state = state_manager.reset_logs_on_goal_change(args.set)
+        state = state_manager.reset_logs_on_goal_change(
+            args.set,
+            events_log=events_log,
+            relevance_cache=relevance_cache
+        )
         print(f"✓ Goal updated: {args.set}")
     else:
         state = state_manager.load()
@@ -239,5 +277,164 @@ def manage_goal():
         print("=" * 60)
 
 
+def replay():
+    """Entry point for drift-watcher-replay command."""
+    parser = argparse.ArgumentParser(
+        description="Replay a recorded event log offline to compare window sizes and drift thresholds"
+    )
+    parser.add_argument(
+        "--events",
+        type=str,
+        default=None,
+        help="Event log, segment directory or SQLite store to replay; .gz logs are read too "
+             "(default: the profile's events_path)"
+    )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help="Path to config file (default: ~/.drift-watcher/config.json)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Profile whose goal, events and local stages to use"
+    )
+    parser.add_argument(
+        "--goal",
+        type=str,
+        default=None,
+        help="Goal to assess against (default: the profile's current goal)"
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Window sizes in seconds to replay (default: agent.window_seconds)"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        nargs="+",
+        default=None,
+        help="Drift confidence thresholds to score (default: agent.drift_confidence_threshold)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Windows assessed in parallel (default: agent.llm_workers)"
+    )
+    parser.add_argument(
+        "--cache",
+        type=str,
+        default="replay_cache.db",
+        help="LLM response cache shared between replays (default: ~/.drift-watcher/replay_cache.db)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Call the LLM for every window, even if a response is cached"
+    )
+    parser.add_argument(
+        "--timeline",
+        type=str,
+        default=None,
+        help="Write every window's verdict here, as CSV if the name ends in .csv, else JSON lines"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the summaries as JSON instead of a table"
+    )
+
+    args = parser.parse_args()
+
+    # Paths given on the command line are relative to where we were run
+    for name in ("events", "config", "timeline"):
+        if getattr(args, name):
+            setattr(args, name, str(Path(getattr(args, name)).resolve()))
+    data_dir = get_data_dir()
+    if args.config is None:
+        args.config = str(data_dir / "config.json")
+    os.chdir(data_dir)
+
+    from .config import Config
+    from .core.agent import build_llm_client
+    from .core.replay import load_events, replay as run_replay
+    from .core.state_manager import build_state_manager
+
+    if not Path(args.config).exists():
+        print(f"❌ No config at {args.config}")
+        return
+    config = Config(args.config)
+    if args.profile:
+        config = config.profile(args.profile)
+
+    goal = args.goal or config.profile_goal
+    if not goal:
+        state_manager = build_state_manager(
+            config.state_backend, config.state_file, config.history_file, config.state_db
+        )
+        goal = state_manager.load().get("goal")
+    if not goal:
+        print("❌ No goal set; pass --goal")
+        return
+
+    events_path = args.events or config.events_path
+    try:
+        events = load_events(events_path)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return
+    if not events:
+        print(f"… no events in {events_path}")
+        return
+
+    llm_client = build_llm_client(config.llm_config)
+    print(f"🎯 Goal: {goal}", file=sys.stderr)
+    print(f"📼 Replaying {len(events)} events from {events_path} with {llm_client.name}", file=sys.stderr)
+    result = run_replay(
+        config, llm_client, events, goal,
+        window_sizes=args.window,
+        thresholds=args.threshold,
+        workers=args.workers,
+        cache_file=None if args.no_cache else args.cache
+    )
+
+    if args.timeline:
+        _write_timeline(args.timeline, result["timeline"])
+        print(f"📝 Timeline written to {args.timeline}", file=sys.stderr)
+
+    if args.json:
+        import json
+        print(json.dumps(result["summaries"], indent=2))
+        return
+
+    print(f"{'window':>7} {'thresh':>6} {'windows':>7} {'focus%':>7} {'alerts':>6} {'episodes':>8} "
+          f"{'llm':>5} {'cached':>6} {'elapsed':>8} {'speedup':>8}")
+    for s in result["summaries"]:
+        focus = f"{100 * s['focus_ratio']:.1f}" if s["focus_ratio"] is not None else "-"
+        speedup = f"{s['speedup']:.0f}x" if s["speedup"] else "-"
+        print(f"{s['window_seconds']:>6}s {s['threshold']:>6.2f} {s['windows']:>7} {focus:>7} {s['alerts']:>6} "
+              f"{s['drift_episodes']:>8} {s['llm_calls']:>5} {s['cache_hits']:>6} {s['elapsed_s']:>7.1f}s {speedup:>8}")
+
+
+def _write_timeline(path, timeline):
+    """Write replayed windows as CSV or JSON lines, depending on the suffix."""
+    import json
+    with open(path, "w", newline="") as f:
+        if path.endswith(".csv"):
+            import csv
+            writer = csv.DictWriter(f, fieldnames=list(timeline[0]) if timeline else ["window_seconds"])
+            writer.writeheader()
+            writer.writerows(timeline)
+        else:
+            for window in timeline:
+                f.write(json.dumps(window) + "\n")
+
+
 if __name__ == "__main__":
     main()
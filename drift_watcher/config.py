@@ -1,6 +1,19 @@
 import json
 from pathlib import Path
-from typing import Dict, Any
+from typing import Any, Dict, List, Optional
+
+
+# Default location of the event store for each storage backend
+EVENTS_PATHS = {
+    "file": "events.log",
+    "segmented": "events",
+    "sqlite": "events.db",
+}
+
+# Config sections a profile may override; llm, rules and prescorer are shared
+PROFILE_SECTIONS = ("agent", "storage", "server")
+# Per-profile state files live under profiles/<name>/ unless set explicitly
+PROFILES_DIR = "profiles"
 
 
 class Config:
@@ -21,6 +34,55 @@ class Config:
     def save(self):
         self.config_file.write_text(json.dumps(self._config, indent=2))
 
+    def profiles(self) -> List["Config"]:
+        """One Config per entry of the ``profiles`` list, or just this config."""
+        entries = self._config.get("profiles")
+        if not entries:
+            return [self]
+        return [self._for_profile(entry) for entry in entries]
+
+    def profile(self, name: str) -> "Config":
+        """The Config of a single named profile."""
+        for profile in self.profiles():
+            if profile.profile_name == name:
+                return profile
+        raise ValueError(f"Unknown profile '{name}'. Available: {[p.profile_name for p in self.profiles()]}")
+
+    def _for_profile(self, entry: Dict[str, Any]) -> "Config":
+        if not entry.get("name"):
+            raise ValueError("Every entry in 'profiles' needs a name")
+        merged = dict(self._config)
+        merged.pop("profiles")
+        for section in PROFILE_SECTIONS:
+            merged[section] = {**self._config.get(section, {}), **entry.get(section, {})}
+        merged["profile"] = entry
+
+        config = Config.__new__(Config)
+        config.config_file = self.config_file
+        config._config = merged
+        return config
+
+    def _profile_path(self, filename: str) -> str:
+        if "profile" not in self._config:
+            return filename
+        return str(Path(PROFILES_DIR) / self.profile_name / filename)
+
+    @property
+    def profile_name(self) -> str:
+        return self._config.get("profile", {}).get("name", "default")
+
+    @property
+    def profile_goal(self) -> Optional[str]:
+        return self._config.get("profile", {}).get("goal")
+
+    @property
+    def state_file(self) -> str:
+        return self._config.get("profile", {}).get("state_file", self._profile_path("agent_state.json"))
+
+    @property
+    def history_file(self) -> str:
+        return self._config.get("profile", {}).get("history_file", self._profile_path("session_history.json"))
+
     @property
     def llm_config(self) -> Dict[str, Any]:
         return self._config["llm"]
@@ -33,10 +95,52 @@ class Config:
     def drift_threshold(self) -> float:
         return self._config["agent"]["drift_confidence_threshold"]
 
+    @property
+    def assessment_deadline_seconds(self) -> float:
+        default = max(1.0, self.window_seconds * 0.8)
+        return self._config["agent"].get("assessment_deadline_seconds", default)
+
+    @property
+    def prompt_token_budget(self) -> int:
+        return self._config["agent"].get("prompt_token_budget", 2048)
+
+    @property
+    def trigger(self) -> str:
+        return self._config["agent"].get("trigger", "events")
+
+    @property
+    def debounce_seconds(self) -> float:
+        return self._config["agent"].get("debounce_seconds", 2.0)
+
+    @property
+    def min_interval_seconds(self) -> float:
+        return self._config["agent"].get("min_interval_seconds", 10.0)
+
+    @property
+    def llm_workers(self) -> int:
+        return self._config["agent"].get("llm_workers", 2)
+
+    @property
+    def metrics_file(self) -> Optional[str]:
+        # Shared by all profiles: one agent process, one set of metrics
+        return self._config["agent"].get("metrics_file", "agent_metrics.prom")
+
     @property
     def log_retention_days(self) -> int:
         return self._config["agent"].get("log_retention_days", 7)
 
+    @property
+    def rules_config(self) -> Dict[str, Any]:
+        return self._config.get("rules", {})
+
+    @property
+    def prescorer_config(self) -> Dict[str, Any]:
+        return self._config.get("prescorer", {})
+
+    @property
+    def fingerprint_config(self) -> Dict[str, Any]:
+        return self._config.get("fingerprint", {"enabled": True})
+
     @property
     def server_host(self) -> str:
         return self._config["server"]["host"]
@@ -44,3 +148,68 @@ class Config:
     @property
     def server_port(self) -> int:
         return self._config["server"]["port"]
+
+    @property
+    def server_mode(self) -> str:
+        return self._config["server"].get("mode", "flask")
+
+    @property
+    def server_durability(self) -> str:
+        return self._config["server"].get("durability", "always")
+
+    @property
+    def fsync_interval_ms(self) -> int:
+        return self._config["server"].get("fsync_interval_ms", 100)
+
+    @property
+    def buffer_max_events(self) -> int:
+        return self._config["server"].get("buffer_max_events", 10000)
+
+    @property
+    def buffer_max_age_seconds(self) -> int:
+        return self._config["server"].get("buffer_max_age_seconds", 3600)
+
+    @property
+    def relevance_cache_enabled(self) -> bool:
+        return self._config["agent"].get("relevance_cache", True)
+
+    @property
+    def relevance_cache_file(self) -> str:
+        return self._config["agent"].get("relevance_cache_file", self._profile_path("relevance_cache.json"))
+
+    @property
+    def relevance_cache_ttl_seconds(self) -> int:
+        return self._config["agent"].get("relevance_cache_ttl_seconds", 86400)
+
+    @property
+    def relevance_cache_max_entries(self) -> int:
+        return self._config["agent"].get("relevance_cache_max_entries", 5000)
+
+    @property
+    def event_source(self) -> str:
+        return self._config["agent"].get("event_source", "file")
+
+    @property
+    def events_backend(self) -> str:
+        return self._config.get("storage", {}).get("events_backend", "file")
+
+    @property
+    def state_backend(self) -> str:
+        return self._config.get("storage", {}).get("state_backend", "json")
+
+    @property
+    def state_db(self) -> str:
+        return self._config.get("storage", {}).get("state_db", self._profile_path("drift_watcher.db"))
+
+    @property
+    def rollups_enabled(self) -> bool:
+        return self._config.get("storage", {}).get("rollups", True)
+
+    @property
+    def rollups_db(self) -> str:
+        return self._config.get("storage", {}).get("rollups_db", self._profile_path("rollups.db"))
+
+    @property
+    def events_path(self) -> str:
+        default = EVENTS_PATHS.get(self.events_backend, "events.log")
+        return self._config.get("storage", {}).get("events_path", default)
@@ -1,4 +1,9 @@
 from .agent import run_agent_loop
-from .state_manager import StateManager
+from .assessor import DeadlineAssessor
+from .pipeline import AssessmentPipeline
+from .profile import AgentProfile
+from .replay import CachingClient, ReplayCache, load_events, replay
+from .state_manager import SQLiteStateManager, StateManager, build_state_manager
 
-__all__ = ["run_agent_loop", "StateManager"]
+__all__ = ["run_agent_loop", "AgentProfile", "AssessmentPipeline", "CachingClient", "DeadlineAssessor", "ReplayCache",
+           "SQLiteStateManager", "StateManager", "build_state_manager", "load_events", "replay"]
@@ -1,12 +1,15 @@
+import threading
 import time
-from ..tracking import EventReader, ActivityProcessor
-from ..llm import LLMReasoner, OllamaClient, BedrockClient
-from ..utils import Notifier
-from ..config import Config
-from .state_manager import StateManager
+from concurrent.futures import ThreadPoolExecutor
 
+from ..llm import OllamaClient, BedrockClient
+from ..utils import METRICS, Notifier
+from ..config import Config
+from .profile import STAGE_SECONDS, AgentProfile
 
-EVENTS_FILE = "events.log"
+LAST_PUBLISH = METRICS.gauge(
+    "drift_watcher_agent_last_publish_timestamp_seconds", "When the agent last published its metrics"
+)
 
 PROVIDERS = {
     "ollama": OllamaClient,
@@ -26,12 +29,33 @@ def build_llm_client(llm_config: dict):
     return client_class(**config)
 
 
-def run_agent_loop(config_file: str = "config.json", goal: str = None):
-    """Main loop that monitors focus and detects drift."""
+def publish_metrics(metrics_file):
+    """Write the agent's metrics where the event server serves them on /metrics."""
+    if not metrics_file:
+        return
+    LAST_PUBLISH.set(time.time())
+    try:
+        METRICS.publish(metrics_file)
+    except OSError as e:
+        print(f"⚠️ Could not publish metrics to {metrics_file}: {e}")
+
+
+def run_agent_loop(config_file: str = "config.json", goal: str = None, profile: str = None):
+    """Main loop that monitors focus and detects drift.
+
+    Runs every profile in the config (or only ``profile``) in one process.
+    Profiles keep their own goal, events, state and thresholds; they share
+    the LLM client and a pool of ``agent.llm_workers`` threads, so windows
+    due at the same tick are assessed concurrently.
+    """
     print("🧠 Drift Watcher started")
     
     # Load configuration
     config = Config(config_file)
+    profile_configs = [config.profile(profile)] if profile else config.profiles()
+    if goal and len(profile_configs) > 1:
+        print("❌ --goal needs a single profile; pass --profile or set 'goal' per profile")
+        return
     provider = config.llm_config.get("provider", "ollama")
     model_name = config.llm_config.get("model", config.llm_config.get("model_id", "unknown"))
     print(f"📋 Provider: {provider} | Model: {model_name} | Window: {config.window_seconds}s")
@@ -44,85 +68,66 @@ def run_agent_loop(config_file: str = "config.json", goal: str = None):
     except Exception as e:
         print(f"❌ Failed to initialize LLM client: {e}")
         return
+
+    if getattr(llm_client, "warm_up_on_start", False):
+        # Pay the model load now rather than on the first window
+        try:
+            timings = llm_client.warm_up()
+            print(f"🔥 Model warmed up in {timings['wall_s']}s (load {timings['load_s']}s)")
+        except Exception as e:
+            print(f"⚠️ Model warm-up failed, first window will load it: {e}")
     
     # Initialize components
-    state_manager = StateManager()
-    event_reader = EventReader(EVENTS_FILE, max_age_days=config.log_retention_days)
-    activity_processor = ActivityProcessor()
-    reasoner = LLMReasoner(client=llm_client)
+    llm_pool = ThreadPoolExecutor(max_workers=config.llm_workers, thread_name_prefix="llm")
+    profiles = [AgentProfile(c, llm_client, executor=llm_pool, goal=goal) for c in profile_configs]
     notifier = Notifier()
-    
-    # Handle goal changes and log cleanup
-    if goal:
-        state = state_manager.reset_logs_on_goal_change(goal)
-        print(f"🎯 Goal updated: {goal}")
-    else:
-        state = state_manager.load()
-        goal = state["goal"]
-        print(f"🎯 Goal: {goal}")
-    
-    # Cleanup old logs on startup
-    removed = event_reader.cleanup_old_logs()
-    if removed > 0:
-        print(f"🗑️  Cleaned up {removed} old log entries")
-    
-    loop_count = 0
+    # Same start for everyone, so profiles with equal windows are due together
+    start = time.monotonic()
+    wake = threading.Event()
+    for p in profiles:
+        p.next_tick = start + p.window_seconds
+        p.watch(wake)
+    if len(profiles) > 1:
+        print(f"👥 Profiles: {', '.join(p.name for p in profiles)} | LLM workers: {config.llm_workers}")
+        sources = [p.source for p in profiles]
+        for shared in {s for s in sources if sources.count(s) > 1}:
+            print(f"⚠️ Several profiles read events from {shared}; their windows will mix")
+    publish_metrics(config.metrics_file)
     
     while True:
         try:
-            time.sleep(config.window_seconds)
-            loop_count += 1
-            
-            # Cleanup old logs every 100 loops (~50 minutes at 30s intervals)
-            if loop_count % 100 == 0:
-                removed = event_reader.cleanup_old_logs()
-                if removed > 0:
-                    print(f"🗑️  Cleaned up {removed} old log entries")
-            
-            events = event_reader.read_recent(config.window_seconds)
-            
-            if not events:
-                print("… no events in last window")
-                continue
+            # Sleep until the next profile is due or new events arrive;
+            # with nothing pending at all, wait for events indefinitely
+            due_times = [t for t in (p.due_at() for p in profiles) if t is not None]
+            delay = min(due_times) - time.monotonic() if due_times else None
+            if delay is None or delay > 0:
+                wake.wait(delay)
+                wake.clear()
+            now = time.monotonic()
+            due = [p for p in profiles if p.due_at() is not None and p.due_at() <= now]
             
-            print(f"🔍 Events in window: {len(events)}")
+            # Start every due window before waiting on any of them
+            pending = []
+            for p in due:
+                p.advance(now)
+                try:
+                    activity_summary = p.collect()
+                    if activity_summary is not None:
+                        # Local stages first, then a single LLM call, bounded by a deadline
+                        future = p.assessor.submit(p.goal, activity_summary)
+                        pending.append((p, activity_summary, future, time.perf_counter()))
+                except Exception as e:
+                    print(f"{p.tag}⚠️ Error: {e}")
             
-            activity_summary = activity_processor.aggregate(events)
-            
-            # Single LLM call to assess focus state
-            result = reasoner.assess_focus_state(goal, activity_summary)
-            state_value = result["state"]
-            confidence = result["confidence"]
-            reason = result["reason"]
-            relevant_percent = result.get("relevant_percent", 0.0)
-            irrelevant_percent = result.get("irrelevant_percent", 0.0)
-            
-            print(
-                f"🧭 State: {state_value} | "
-                f"Confidence: {confidence} | "
-                f"Relevant: {relevant_percent}% | "
-                f"Reason: {reason}"
-            )
-            
-            # Check for drift and notify
-            if state_value == "DRIFTING" and confidence >= config.drift_threshold:
-                print(f"⚠️ DRIFT DETECTED! Confidence: {confidence:.2f} >= {config.drift_threshold}")
-                
-                previous_state = state.get("focus_state", "FOCUSED")
-                if previous_state == "FOCUSED":
-                    state["drift_count"] = state.get("drift_count", 0) + 1
-                
-                notifier.notify_drift(goal, confidence)
-            elif state_value == "DRIFTING":
-                print(f"⚠️ Drifting but confidence too low: {confidence:.2f} < {config.drift_threshold}")
-            
-            # Update and save state
-            state["focus_state"] = state_value
-            state["confidence"] = confidence
-            state["last_check_ts"] = time.time()
-            state["relevant_percent"] = relevant_percent
-            state["irrelevant_percent"] = irrelevant_percent
-            state_manager.save(state)
+            for p, activity_summary, future, submitted in pending:
+                try:
+                    result = p.assessor.result(future, p.goal, activity_summary)
+                    STAGE_SECONDS.observe(time.perf_counter() - submitted, profile=p.name, stage="assess")
+                    p.report(result, notifier)
+                except Exception as e:
+                    print(f"{p.tag}⚠️ Error: {e}")
+            if due:
+                publish_metrics(config.metrics_file)
         
         except KeyboardInterrupt:
             print("\n🛑 Drift Watcher stopped")
@@ -131,3 +136,7 @@ def run_agent_loop(config_file: str = "config.json", goal: str = None):
         except Exception as e:
             print(f"⚠️ Error: {e}")
             time.sleep(5)
+    
+    for p in profiles:
+        p.stop()
+    llm_pool.shutdown(wait=False)
@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+
+class DeadlineAssessor:
+    """Runs pipeline assessments on a worker thread with a per-call deadline.
+
+    Only one assessment is in flight at a time. When the deadline passes (or
+    the previous window's assessment is still running) the caller gets a
+    degraded verdict instead of waiting: a best-effort estimate from the
+    pipeline's local stages if one can be made, otherwise the last completed
+    result marked stale. A late result still completes in the background and
+    becomes the new "last result".
+    """
+
+    def __init__(self, pipeline, deadline_seconds, executor=None):
+        self.pipeline = pipeline
+        self.deadline_seconds = deadline_seconds
+        # A shared executor bounds LLM concurrency across profiles
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix="assessor")
+        self._inflight = None
+        self._deadline_at = 0.0
+        self.last_result = None
+        self.last_result_ts = 0.0
+        self.missed_deadlines = 0
+
+    def assess(self, goal, activity_summary):
+        """Return a verdict within the deadline, or None if there is nothing to fall back on."""
+        return self.result(self.submit(goal, activity_summary), goal, activity_summary)
+
+    def submit(self, goal, activity_summary):
+        """Start an assessment and return its future, or None if the previous one is still running."""
+        if self._inflight is not None and not self._inflight.done():
+            return None
+
+        future = self._executor.submit(self.pipeline.assess, goal, activity_summary)
+        future.add_done_callback(self._remember)
+        self._inflight = future
+        self._deadline_at = time.monotonic() + self.deadline_seconds
+        return future
+
+    def result(self, future, goal, activity_summary):
+        """Wait for a submitted assessment until its deadline, else return a degraded verdict."""
+        if future is None:
+            return self._degraded(goal, activity_summary, "previous assessment still running")
+        try:
+            return future.result(timeout=max(0.0, self._deadline_at - time.monotonic()))
+        except TimeoutError:
+            self.missed_deadlines += 1
+            return self._degraded(goal, activity_summary, f"no verdict within {self.deadline_seconds:g}s")
+
+    def _remember(self, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.last_result = future.result()
+        self.last_result_ts = time.time()
+
+    def _degraded(self, goal, activity_summary, why):
+        for stage in self.pipeline.stages:
+            estimate = getattr(stage, "estimate", None)
+            result = estimate(goal, activity_summary) if estimate else None
+            if result is not None:
+                result["degraded"] = True
+                result["reason"] = f"{result.get('reason', '')} (degraded: {why})".strip()
+                return result
+
+        if self.last_result is None:
+            return None
+
+        result = dict(self.last_result)
+        result["degraded"] = True
+        result["stale"] = True
+        result["source"] = "stale"
+        age = int(time.time() - self.last_result_ts)
+        result["reason"] = f"{result.get('reason', '')} (stale, {age}s old: {why})".strip()
+        return result
+
+    def shutdown(self):
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
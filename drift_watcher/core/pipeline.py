@@ -0,0 +1,44 @@
+from collections import Counter
+
+
+class AssessmentPipeline:
+    """Runs local assessment stages ahead of the LLM reasoner.
+
+    Each stage has a ``name`` and an ``assess(goal, activity_summary)``
+    method returning a result dict, or None to pass the window on. The first
+    stage with a verdict wins; windows no stage could settle go to the
+    reasoner. Stages with a ``record(goal, activity_summary, result)``
+    method are told every verdict. ``stats`` counts verdicts per source.
+    """
+
+    def __init__(self, reasoner, stages=None):
+        self.reasoner = reasoner
+        self.stages = list(stages or [])
+        self.stats = Counter()
+
+    def assess(self, goal, activity_summary):
+        result = None
+        for stage in self.stages:
+            result = stage.assess(goal, activity_summary)
+            if result is not None:
+                result.setdefault("source", stage.name)
+                break
+
+        if result is None:
+            result = self.reasoner.assess_focus_state(goal, activity_summary)
+            result.setdefault("source", "llm")
+        self.stats[result["source"]] += 1
+
+        for stage in self.stages:
+            record = getattr(stage, "record", None)
+            if record is not None:
+                record(goal, activity_summary, result)
+        return result
+
+    @property
+    def llm_calls_saved(self) -> int:
+        return sum(count for source, count in self.stats.items() if source != "llm")
+
+    def summary(self) -> dict:
+        """Verdict counts per source plus the number of LLM calls avoided."""
+        return {**self.stats, "llm_calls_saved": self.llm_calls_saved}
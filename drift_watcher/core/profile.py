@@ -0,0 +1,308 @@
+import threading
+import time
+from pathlib import Path
+
+from ..tracking import (
+    SlidingWindowAggregator, BackgroundCompactor, LogActivityWatcher, RollupStore, ServerActivityWatcher,
+    ServerEventReader, build_event_reader
+)
+from ..llm import LLMReasoner, PromptBuilder, RelevanceCache
+from ..heuristics import RelevancePrescorer, RulesEngine, WindowFingerprints
+from ..utils.metrics import COUNT_BUCKETS, METRICS
+from .assessor import DeadlineAssessor
+from .pipeline import AssessmentPipeline
+from .state_manager import build_state_manager
+
+STAGE_SECONDS = METRICS.histogram(
+    "drift_watcher_agent_stage_seconds", "Time per window spent in each agent stage", ["profile", "stage"]
+)
+WINDOW_EVENTS = METRICS.histogram(
+    "drift_watcher_agent_window_events", "Events in each assessed window", ["profile"], buckets=COUNT_BUCKETS
+)
+BYTES_READ = METRICS.counter(
+    "drift_watcher_agent_bytes_read_total", "Bytes of event log (or server responses) read", ["profile"]
+)
+ASSESSMENTS = METRICS.counter(
+    "drift_watcher_agent_assessments_total", "Windows assessed, by what settled them", ["profile", "source", "state"]
+)
+
+
+class AgentProfile:
+    """Everything one monitored person needs, isolated from other profiles.
+
+    Each profile has its own goal, event reader, window aggregator, state
+    and history files, relevance cache, local stages and thresholds. Only
+    the LLM client and the executor its assessments run on are shared.
+
+    With ``agent.trigger: "events"`` a window is assessed when new events
+    have settled for ``debounce_seconds``, or at the latest one window
+    after the first of them, but no sooner than ``min_interval_seconds``
+    after the previous assessment; without new events the profile stays idle.
+    ``"interval"`` assesses on a fixed cadence instead.
+    """
+
+    def __init__(self, config, llm_client, executor=None, goal=None):
+        self.config = config
+        self.name = config.profile_name
+        # Single-profile output looks exactly as before
+        self.tag = "" if self.name == "default" else f"[{self.name}] "
+        self.window_seconds = config.window_seconds
+        self.next_tick = time.monotonic() + self.window_seconds
+        self.loop_count = 0
+        self.trigger = config.trigger
+        self.debounce_seconds = config.debounce_seconds
+        self.min_interval_seconds = config.min_interval_seconds
+        self.watcher = None
+        self._activity_lock = threading.Lock()
+        self._first_activity = None
+        self._last_activity = None
+        self._last_assessed = None
+
+        Path(config.state_file).parent.mkdir(parents=True, exist_ok=True)
+        self.state_manager = build_state_manager(
+            config.state_backend, config.state_file, config.history_file, config.state_db
+        )
+        self.event_reader = build_event_reader(
+            config.events_backend,
+            config.events_path,
+            max_age_days=config.log_retention_days
+        )
+        if config.event_source == "server":
+            # Pull windows from the server's memory; the log stays the fallback
+            self.event_reader = ServerEventReader(
+                f"http://{config.server_host}:{config.server_port}",
+                fallback=self.event_reader,
+                profile=self.server_profile
+            )
+        self.activity_processor = SlidingWindowAggregator(self.window_seconds)
+
+        # Time per verdict; windows overlap, so only count events not counted yet
+        self.rollups = RollupStore(config.rollups_db) if config.rollups_enabled else None
+        self._rolled_up_ts = 0
+        self._window_new_ms = 0
+        self._window_newest_ts = 0
+
+        # Handle goal changes and log cleanup. A config goal is persistent, so
+        # only a different one starts a new session; --goal always does.
+        saved = self.state_manager.load()
+        if not goal and config.profile_goal and config.profile_goal != saved.get("goal"):
+            goal = config.profile_goal
+        if goal:
+            self.state = self.state_manager.reset_logs_on_goal_change(
+                goal,
+                events_log=config.events_path,
+                relevance_cache=config.relevance_cache_file
+            )
+            print(f"{self.tag}🎯 Goal updated: {goal}")
+        else:
+            self.state = saved
+            goal = self.state["goal"]
+            print(f"{self.tag}🎯 Goal: {goal}")
+        self.goal = goal
+
+        # Built after a goal change so a stale cache file is already gone
+        cache = None
+        if config.relevance_cache_enabled:
+            cache = RelevanceCache(
+                config.relevance_cache_file,
+                ttl_seconds=config.relevance_cache_ttl_seconds,
+                max_entries=config.relevance_cache_max_entries
+            )
+        reasoner = LLMReasoner(
+            client=llm_client,
+            cache=cache,
+            prompt_builder=PromptBuilder(token_budget=config.prompt_token_budget)
+        )
+
+        # Local stages that can settle a window without the LLM
+        stages = []
+        self.fingerprints = None
+        if config.fingerprint_config.get("enabled", True):
+            # Cheapest check first: an unchanged window reuses its verdict
+            self.fingerprints = WindowFingerprints.from_config(config.fingerprint_config)
+            stages.append(self.fingerprints)
+        if config.rules_config.get("entries"):
+            stages.append(RulesEngine.from_config(config.rules_config))
+            print(f"{self.tag}📏 Rules: {len(stages[-1].entries)} loaded")
+        if config.prescorer_config.get("enabled"):
+            stages.append(RelevancePrescorer.from_config(config.prescorer_config))
+            print(f"{self.tag}🧮 Local relevance prescorer enabled")
+        self.pipeline = AssessmentPipeline(reasoner, stages)
+        self.assessor = DeadlineAssessor(
+            self.pipeline,
+            deadline_seconds=config.assessment_deadline_seconds,
+            executor=executor
+        )
+
+        # Cleanup old logs on startup, off the hot path
+        self.compactor = BackgroundCompactor(self.event_reader)
+        self.compactor.request()
+
+    @property
+    def server_profile(self):
+        """The ?profile= this profile reads server events with; None without a profiles list."""
+        return None if self.name == "default" else self.name
+
+    @property
+    def source(self) -> str:
+        """Where this profile reads events from, to spot profiles sharing one."""
+        path = str(Path(self.config.events_path).resolve())
+        if self.config.event_source == "server":
+            # The server keeps one buffer per events_path, shared like the log
+            return f"http://{self.config.server_host}:{self.config.server_port} ({path})"
+        return path
+
+    def watch(self, wake):
+        """Start watching for new events; ``wake`` is set whenever some arrive."""
+        if self.trigger != "events":
+            return
+        if self.config.event_source == "server":
+            self.watcher = ServerActivityWatcher(
+                f"http://{self.config.server_host}:{self.config.server_port}",
+                profile=self.server_profile
+            )
+        else:
+            self.watcher = LogActivityWatcher(self.config.events_path, backend=self.config.events_backend)
+
+        def on_activity():
+            now = time.monotonic()
+            with self._activity_lock:
+                if self._first_activity is None:
+                    self._first_activity = now
+                self._last_activity = now
+            wake.set()
+
+        self.watcher.start(on_activity)
+
+    def stop(self):
+        if self.watcher is not None:
+            self.watcher.stop()
+
+    def due_at(self):
+        """Monotonic time the next window is due, or None while idle."""
+        if self.trigger != "events":
+            return self.next_tick
+        with self._activity_lock:
+            if self._first_activity is None:
+                return None
+            # Debounce bursts, but never hold activity back longer than a window
+            due = min(self._last_activity + self.debounce_seconds, self._first_activity + self.window_seconds)
+        # Steady tab switching must not turn into an assessment every few seconds
+        if self._last_assessed is not None:
+            due = max(due, self._last_assessed + self.min_interval_seconds)
+        return due
+
+    def advance(self, now):
+        """Consume the due window: clear pending activity, or move to the next tick."""
+        if self.trigger == "events":
+            with self._activity_lock:
+                self._first_activity = self._last_activity = None
+            self._last_assessed = now
+        else:
+            # Fixed cadence, skipping windows we fell behind on
+            self.next_tick += self.window_seconds
+            behind = now - self.next_tick
+            if behind > 0:
+                skipped = int(behind // self.window_seconds) + 1
+                print(f"{self.tag}⏭️  Running {skipped} window(s) behind, resyncing")
+                self.next_tick += skipped * self.window_seconds
+        self.loop_count += 1
+
+        # Cleanup old logs every 100 assessments (~50 minutes at 30s intervals)
+        if self.loop_count % 100 == 0:
+            self.compactor.request()
+
+    def collect(self):
+        """Activity summary of the last window, or None if nothing happened."""
+        bytes_before = getattr(self.event_reader, "bytes_read", 0)
+        with STAGE_SECONDS.time(profile=self.name, stage="read"):
+            events = self.event_reader.read_recent(self.window_seconds)
+        BYTES_READ.inc(getattr(self.event_reader, "bytes_read", 0) - bytes_before, profile=self.name)
+        WINDOW_EVENTS.observe(len(events), profile=self.name)
+
+        if not events:
+            print(f"{self.tag}… no events in last window")
+            return None
+
+        print(f"{self.tag}🔍 Events in window: {len(events)}")
+        new = [e for e in events if e.get("server_ts", 0) > self._rolled_up_ts]
+        self._window_new_ms = sum(int(e.get("durationMs") or 0) for e in new)
+        self._window_newest_ts = max((e.get("server_ts", 0) for e in new), default=self._rolled_up_ts)
+        with STAGE_SECONDS.time(profile=self.name, stage="aggregate"):
+            return self.activity_processor.aggregate(events)
+
+    def report(self, result, notifier):
+        """Print a verdict, notify on drift and save it to this profile's state."""
+        if result is None:
+            print(f"{self.tag}⏳ Assessment still running and nothing to fall back on, skipping window")
+            return
+
+        state = self.state
+        state_value = result["state"]
+        confidence = result["confidence"]
+        reason = result["reason"]
+        relevant_percent = result.get("relevant_percent", 0.0)
+        irrelevant_percent = result.get("irrelevant_percent", 0.0)
+        source = "degraded" if result.get("degraded") else result.get("source", "llm")
+        ASSESSMENTS.inc(profile=self.name, source=source, state=state_value)
+
+        if result.get("degraded"):
+            print(f"{self.tag}🐢 LLM too slow, using degraded verdict from {result.get('source')} "
+                  f"({self.assessor.missed_deadlines} deadline(s) missed)")
+        elif result.get("source") == "fingerprint":
+            print(f"{self.tag}♻️ Window unchanged, reused {result.get('reused_from')} verdict "
+                  f"from {result.get('reused_age_s')}s ago, skipped LLM call")
+        elif result.get("source") == "cache":
+            print(f"{self.tag}💾 All pages cached, skipped LLM call")
+        elif result.get("source") != "llm":
+            print(f"{self.tag}⚡ Settled by {result.get('source')}, skipped LLM call "
+                  f"({self.pipeline.llm_calls_saved} saved so far)")
+
+        print(
+            f"{self.tag}🧭 State: {state_value} | "
+            f"Confidence: {confidence} | "
+            f"Relevant: {relevant_percent}% | "
+            f"Reason: {reason}"
+        )
+
+        # Check for drift and notify
+        if result.get("degraded"):
+            # An estimate or a stale verdict is shown but never alerted on or
+            # saved, so drift episodes and focus ratios only count real verdicts
+            if state_value == "DRIFTING":
+                print(f"{self.tag}⚠️ Drifting (degraded verdict, not notifying)")
+            return
+
+        threshold = self.config.drift_threshold
+        if state_value == "DRIFTING" and confidence >= threshold:
+            print(f"{self.tag}⚠️ DRIFT DETECTED! Confidence: {confidence:.2f} >= {threshold}")
+
+            previous_state = state.get("focus_state", "FOCUSED")
+            if previous_state == "FOCUSED":
+                state["drift_count"] = state.get("drift_count", 0) + 1
+
+            with STAGE_SECONDS.time(profile=self.name, stage="notify"):
+                notifier.notify_drift(self.goal, confidence)
+        elif state_value == "DRIFTING":
+            print(f"{self.tag}⚠️ Drifting but confidence too low: {confidence:.2f} < {threshold}")
+
+        # Update and save state
+        state["focus_state"] = state_value
+        state["confidence"] = confidence
+        # Per-session counts behind the history summary's focus ratio
+        state["checks"] = state.get("checks", 0) + 1
+        if state_value == "FOCUSED":
+            state["focused_checks"] = state.get("focused_checks", 0) + 1
+        state["last_check_ts"] = time.time()
+        state["relevant_percent"] = relevant_percent
+        state["irrelevant_percent"] = irrelevant_percent
+        state["assessment_sources"] = self.pipeline.summary()
+        if self.fingerprints is not None:
+            state["fingerprint"] = self.fingerprints.stats()
+        with STAGE_SECONDS.time(profile=self.name, stage="save"):
+            self.state_manager.save(state)
+
+            if self.rollups is not None:
+                self.rollups.add_verdict(state_value, self._window_new_ms)
+                self.rollups.flush()
+                self._rolled_up_ts = self._window_newest_ts
@@ -0,0 +1,271 @@
+import gzip
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from ..llm import BaseLLMClient, LLMReasoner, PromptBuilder
+from ..heuristics import RelevancePrescorer, RulesEngine
+from ..tracking import ActivityProcessor, SegmentedEventLog, SQLiteEventStore
+from .pipeline import AssessmentPipeline
+
+
+def load_events(path):
+    """Every event of a recorded log, oldest first.
+
+    ``path`` may be a JSONL log (optionally gzipped), a segmented log
+    directory or an SQLite event store.
+    """
+    path = Path(path)
+    if path.is_dir():
+        events = []
+        for segment in SegmentedEventLog(path).segments_since(0):
+            events.extend(_read_jsonl(segment))
+    elif SQLiteEventStore.is_store(path):
+        events = SQLiteEventStore(path).since(0)
+    elif path.exists():
+        events = _read_jsonl(path)
+    else:
+        raise FileNotFoundError(f"No event log at {path}")
+    events.sort(key=lambda e: e.get("server_ts", 0))
+    return events
+
+
+def _read_jsonl(path):
+    opener = gzip.open if path.suffix == ".gz" else open
+    events = []
+    with opener(path, "rt") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return events
+
+
+def slice_windows(events, window_seconds):
+    """Split time-sorted events into consecutive ``window_seconds`` windows.
+
+    Yields (end_ts_ms, events) for each window that has events; idle
+    stretches are skipped rather than walked window by window.
+    """
+    if not events:
+        return
+    width = int(window_seconds * 1000)
+    origin = events[0].get("server_ts", 0)
+    start, current = None, []
+    for event in events:
+        ts = event.get("server_ts", 0)
+        bucket = origin + (ts - origin) // width * width
+        if bucket != start:
+            if current:
+                yield start + width, current
+            start, current = bucket, []
+        current.append(event)
+    if current:
+        yield start + width, current
+
+
+class ReplayCache:
+    """LLM responses keyed by prompt, in an SQLite table (WAL mode).
+
+    Replays of the same log with the same goal and window size build the
+    same prompts, so only the first run pays for LLM calls; changing the
+    drift threshold afterwards is free.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS responses (
+        key TEXT PRIMARY KEY,
+        response TEXT NOT NULL,
+        created_ts REAL NOT NULL
+    ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path="replay_cache.db"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def key(provider, prompt, max_tokens, temperature) -> str:
+        return hashlib.sha1(f"{provider}\n{max_tokens}\n{temperature}\n{prompt}".encode()).hexdigest()
+
+    def get(self, key):
+        with self._connect() as db:
+            row = db.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, response):
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, created_ts) VALUES (?, ?, ?)",
+                (key, json.dumps(response), time.time())
+            )
+
+
+class CachingClient(BaseLLMClient):
+    """Wraps an LLM client so identical prompts are answered from a ReplayCache."""
+
+    def __init__(self, client, cache):
+        self.client = client
+        self.cache = cache
+        self.calls = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    @property
+    def name(self) -> str:
+        return self.client.name
+
+    def invoke(self, prompt, max_tokens=200, temperature=0.2):
+        key = self.cache.key(self.client.name, prompt, max_tokens, temperature)
+        response = self.cache.get(key)
+        if response is not None:
+            with self._lock:
+                self.hits += 1
+            return dict(response)
+        response = self.client.invoke(prompt, max_tokens=max_tokens, temperature=temperature)
+        with self._lock:
+            self.calls += 1
+        self.cache.put(key, response)
+        return dict(response)
+
+
+def build_replay_pipeline(config, client):
+    """The agent's assessment pipeline, minus state that depends on wall-clock order.
+
+    Window fingerprints and the relevance cache reuse verdicts across
+    consecutive windows, which parallel replay does not preserve; the
+    rules engine and prescorer are stateless and kept.
+    """
+    reasoner = LLMReasoner(client=client, prompt_builder=PromptBuilder(token_budget=config.prompt_token_budget))
+    stages = []
+    if config.rules_config.get("entries"):
+        stages.append(RulesEngine.from_config(config.rules_config))
+    if config.prescorer_config.get("enabled"):
+        stages.append(RelevancePrescorer.from_config(config.prescorer_config))
+    return AssessmentPipeline(reasoner, stages)
+
+
+def replay_windows(pipeline, goal, events, window_seconds, workers=2):
+    """Assess every window of ``events`` on a pool of ``workers`` threads.
+
+    Returns the timeline: one dict per window, in order, with its end
+    time, event count, tracked minutes and verdict.
+    """
+    windows = list(slice_windows(events, window_seconds))
+
+    def assess(window):
+        end_ts, window_events = window
+        summary = ActivityProcessor().aggregate(window_events)
+        try:
+            result = pipeline.assess(goal, summary)
+        except Exception as e:
+            result = {"state": "ERROR", "confidence": 0.0, "reason": str(e), "source": "error"}
+        return {
+            "window_seconds": window_seconds,
+            "end_ts": end_ts,
+            "events": len(window_events),
+            "minutes": summary.get("total_minutes", 0.0),
+            "state": result.get("state"),
+            "confidence": result.get("confidence", 0.0),
+            "relevant_percent": result.get("relevant_percent", 0.0),
+            "source": result.get("source", "llm"),
+            "reason": result.get("reason", ""),
+        }
+
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="replay") as pool:
+        return list(pool.map(assess, windows))
+
+
+def summarize(timeline, threshold):
+    """Alerts and drift episodes a timeline would have produced at ``threshold``.
+
+    Mirrors the agent: a window alerts when it is DRIFTING with confidence
+    at or above the threshold, and an alert after a FOCUSED window starts
+    a new drift episode (the agent's ``drift_count``).
+    """
+    summary = {
+        "threshold": threshold, "windows": len(timeline), "focused": 0, "drifting": 0, "errors": 0,
+        "alerts": 0, "drift_episodes": 0, "focused_minutes": 0.0, "drifting_minutes": 0.0,
+    }
+    previous = "FOCUSED"
+    for window in timeline:
+        state = window["state"]
+        if state == "ERROR":
+            summary["errors"] += 1
+            continue
+        if state == "DRIFTING":
+            summary["drifting"] += 1
+            summary["drifting_minutes"] += window["minutes"]
+            if window["confidence"] >= threshold:
+                summary["alerts"] += 1
+                if previous == "FOCUSED":
+                    summary["drift_episodes"] += 1
+        else:
+            summary["focused"] += 1
+            summary["focused_minutes"] += window["minutes"]
+        previous = state
+    assessed = summary["focused"] + summary["drifting"]
+    summary["focus_ratio"] = round(summary["focused"] / assessed, 3) if assessed else None
+    summary["focused_minutes"] = round(summary["focused_minutes"], 1)
+    summary["drifting_minutes"] = round(summary["drifting_minutes"], 1)
+    return summary
+
+
+def replay(config, client, events, goal, window_sizes=None, thresholds=None, workers=None,
+           cache_file="replay_cache.db"):
+    """Replay recorded events for each window size and score each threshold.
+
+    LLM responses go through a ReplayCache at ``cache_file`` (None to
+    disable it), so rerunning with other thresholds makes no LLM calls.
+    Returns {"summaries": [...], "timeline": [...]}; each summary is
+    one (window size, threshold) pair with its speed-up over real time.
+    """
+    window_sizes = window_sizes or [config.window_seconds]
+    thresholds = thresholds or [config.drift_threshold]
+    workers = workers or config.llm_workers
+    if cache_file is not None:
+        client = CachingClient(client, ReplayCache(cache_file))
+    span = (events[-1]["server_ts"] - events[0]["server_ts"]) / 1000 if events else 0.0
+
+    summaries, timeline = [], []
+    for window_seconds in window_sizes:
+        calls_before = getattr(client, "calls", 0)
+        hits_before = getattr(client, "hits", 0)
+        pipeline = build_replay_pipeline(config, client)
+        started = time.perf_counter()
+        windows = replay_windows(pipeline, goal, events, window_seconds, workers)
+        elapsed = time.perf_counter() - started
+        timeline.extend(windows)
+
+        for threshold in thresholds:
+            summary = summarize(windows, threshold)
+            summary.update({
+                "window_seconds": window_seconds,
+                "sources": dict(pipeline.stats),
+                "llm_calls": getattr(client, "calls", 0) - calls_before,
+                "cache_hits": getattr(client, "hits", 0) - hits_before,
+                "elapsed_s": round(elapsed, 3),
+                "replayed_s": round(span, 1),
+                "speedup": round(span / elapsed, 1) if elapsed and span else None,
+            })
+            summaries.append(summary)
+    return {"summaries": summaries, "timeline": timeline}
@@ -1,14 +1,53 @@
 import json
+import os
+from bisect import bisect_left
+import sqlite3
+import tempfile
 import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 
+from ..tracking.segmented_log import SegmentedEventLog
+from ..tracking.sqlite_store import SQLiteEventStore
+
+SUMMARY_FIELDS = ("sessions", "seconds", "drift_count", "checks", "focused_checks")
+
+
+def summary_buckets(end_ts):
+    """(period, key) buckets of the history summary a session ending at end_ts counts in."""
+    day = datetime.fromtimestamp(end_ts).date()
+    year, week, _ = day.isocalendar()
+    return [("total", "all"), ("day", day.isoformat()), ("week", f"{year}-W{week:02d}")]
+
+
+def summary_counts(session):
+    """What one session adds to each of its summary buckets."""
+    return {
+        "sessions": 1,
+        "seconds": max(0.0, session.get("end_ts", 0) - session.get("start_ts", 0)),
+        "drift_count": session.get("drift_count", 0),
+        "checks": session.get("checks", 0),
+        "focused_checks": session.get("focused_checks", 0),
+    }
+
 
 class StateManager:
-    """Manages Drift Watcher state persistence."""
+    """Manages Drift Watcher state persistence.
+
+    Next to the history file, a summary index (``<history>_summary.json``)
+    keeps per-day, per-week and all-time totals. ``archive_session`` adds
+    each session to it, so reading the summary never touches the history.
+    History pages are cut from a sorted index that is only rebuilt when
+    the history file changes.
+    """
     
     def __init__(self, state_file="agent_state.json", history_file="session_history.json"):
         self.state_file = state_file
         self.history_file = history_file
+        history_path = Path(history_file)
+        self.summary_file = str(history_path.with_name(f"{history_path.stem}_summary.json"))
+        self._history_index = None  # (history version, [(end_ts, id)], sessions), oldest first
     
     def load(self):
         """Load state from file."""
@@ -20,8 +59,20 @@ class StateManager:
     
     def save(self, state):
         """Save state to file."""
-        with open(self.state_file, "w") as f:
-            json.dump(state, f, indent=2)
+        self._replace_json(self.state_file, state)
+    
+    @staticmethod
+    def _replace_json(path, data):
+        # Write aside and swap in, so readers never see a half-written file
+        path = Path(path)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
     
     def _default_state(self):
         """Return default state."""
@@ -32,6 +83,8 @@ class StateManager:
             "drift_count": 0,
             "check_interval_min": 20,
             "recent_states": [],
+            "checks": 0,
+            "focused_checks": 0,
             "last_check_ts": 0,
             "session_start_ts": time.time()
         }
@@ -48,27 +101,129 @@ class StateManager:
         """Save session history."""
         with open(self.history_file, "w") as f:
             json.dump(history, f, indent=2)
+        self._replace_json(self.summary_file, self._build_summary(history))
+    
+    def state_version(self):
+        """Cheap token that changes whenever the state is saved."""
+        return self._file_version(self.state_file)
+    
+    def history_version(self):
+        """Cheap token that changes whenever the history is written."""
+        return self._file_version(self.history_file)
+    
+    @staticmethod
+    def _file_version(path):
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+    
+    def query_history(self, limit=None, since_ts=None, before_ts=None, before_id=None):
+        """Sessions ended in [since_ts, before_ts), newest first, at most limit.
+
+        Sessions are ordered by (end_ts, id) and carry their ``id``, here
+        their position in the history file. With ``before_id`` the page
+        starts right after the session (before_ts, before_id), so sessions
+        sharing an end_ts are neither skipped nor repeated.
+        """
+        keys, sessions = self._sorted_history()
+        lo = 0 if since_ts is None else bisect_left(keys, (since_ts, float("-inf")))
+        hi = len(keys) if before_ts is None else bisect_left(
+            keys, (before_ts, float("-inf") if before_id is None else before_id)
+        )
+        if limit is not None:
+            lo = max(lo, hi - limit)
+        return sessions[lo:hi][::-1] if hi > lo else []
+    
+    def _sorted_history(self):
+        version = self.history_version()
+        index = self._history_index
+        if index is None or version is None or index[0] != version:
+            # The history is one JSON array; parse and sort it once per write, not per page
+            history = self.load_history()
+            order = sorted(range(len(history)), key=lambda i: (history[i].get("end_ts", 0), i))
+            index = self._history_index = (
+                version,
+                [(history[i].get("end_ts", 0), i) for i in order],
+                [dict(history[i], id=i) for i in order],
+            )
+        return index[1], index[2]
+    
+    def history_summary(self, days=30, weeks=12):
+        """All-time totals plus the latest ``days`` days and ``weeks`` ISO weeks.
+
+        Returns {"total": counts, "day": [(date, counts)], "week": [(week, counts)]},
+        newest first, where counts has the ``SUMMARY_FIELDS``.
+        """
+        summary = self._load_summary()
+        return {
+            "total": summary["total"].get("all", self._empty_counts()),
+            "day": sorted(summary["day"].items(), reverse=True)[:days],
+            "week": sorted(summary["week"].items(), reverse=True)[:weeks],
+        }
     
     def archive_session(self, state):
         """Archive current session to history."""
         if not state.get("goal") or state["goal"] == "No goal set":
             return
         
+        summary = self._load_summary()
         history = self.load_history()
-        
-        session = {
+        session = self._session_record(state)
+        history.append(session)
+        with open(self.history_file, "w") as f:
+            json.dump(history, f, indent=2)
+        # Only this session's buckets change
+        self._add_to_summary(summary, session)
+        self._replace_json(self.summary_file, summary)
+    
+    @staticmethod
+    def _session_record(state):
+        return {
             "goal": state["goal"],
             "start_ts": state.get("session_start_ts", time.time()),
             "end_ts": time.time(),
             "drift_count": state.get("drift_count", 0),
+            "checks": state.get("checks", 0),
+            "focused_checks": state.get("focused_checks", 0),
             "final_state": state.get("focus_state", "UNKNOWN"),
             "final_confidence": state.get("confidence", 0.0)
         }
-        
-        history.append(session)
-        self.save_history(history)
     
-    def reset_logs_on_goal_change(self, new_goal, events_log="events.log", activity_cache="activity_cache.json"):
+    @staticmethod
+    def _empty_counts():
+        return dict.fromkeys(SUMMARY_FIELDS, 0)
+    
+    @classmethod
+    def _add_to_summary(cls, summary, session):
+        delta = summary_counts(session)
+        for period, key in summary_buckets(session.get("end_ts", 0)):
+            counts = summary[period].setdefault(key, cls._empty_counts())
+            for field, value in delta.items():
+                counts[field] += value
+    
+    @classmethod
+    def _build_summary(cls, history):
+        summary = {"total": {}, "day": {}, "week": {}}
+        for session in history:
+            cls._add_to_summary(summary, session)
+        return summary
+    
+    def _load_summary(self):
+        try:
+            with open(self.summary_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        # Histories from before the index existed are summarized once
+        summary = self._build_summary(self.load_history())
+        if Path(self.history_file).exists():
+            self._replace_json(self.summary_file, summary)
+        return summary
+    
+    def reset_logs_on_goal_change(self, new_goal, events_log="events.log", activity_cache="activity_cache.json",
+                                  relevance_cache="relevance_cache.json"):
         """Reset logs when goal changes."""
         state = self.load()
         old_goal = state.get("goal", "")
@@ -78,9 +233,16 @@ class StateManager:
             # Archive old session
             self.archive_session(state)
             
-            # Clear events log
+            # Clear events log (a directory when the log is segmented)
             events_path = Path(events_log)
-            if events_path.exists():
+            if events_path.is_dir():
+                SegmentedEventLog(events_path).clear()
+                print(f"🗑️  Cleared old event log segments")
+            elif SQLiteEventStore.is_store(events_path):
+                # The server keeps the database open; empty it, don't unlink
+                SQLiteEventStore(events_path).clear()
+                print(f"🗑️  Cleared old event store")
+            elif events_path.exists():
                 events_path.unlink()
                 print(f"🗑️  Cleared old events log")
             
@@ -89,10 +251,240 @@ class StateManager:
             if cache_path.exists():
                 cache_path.unlink()
                 print(f"🗑️  Cleared activity cache")
+            
+            # Page relevance verdicts were judged against the old goal
+            relevance_path = Path(relevance_cache)
+            if relevance_path.exists():
+                relevance_path.unlink()
+                print(f"🗑️  Cleared relevance cache")
         
         # Update goal and reset session
         state["goal"] = new_goal
         state["drift_count"] = 0
+        state["checks"] = 0
+        state["focused_checks"] = 0
         state["session_start_ts"] = time.time()
         self.save(state)
         return state
+
+
+class SQLiteStateManager(StateManager):
+    """StateManager backed by one SQLite database in WAL mode.
+
+    The state is a single row replaced atomically on ``save``; sessions are
+    appended with one INSERT and queried through an index on ``end_ts``.
+    The history summary is a table upserted in the same transaction as
+    each session insert.
+    WAL lets the server read while the agent writes without ever seeing a
+    partial update. On first open, existing ``agent_state.json`` and
+    ``session_history.json`` files are imported once.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        data TEXT NOT NULL,
+        updated_ts REAL NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        goal TEXT NOT NULL,
+        start_ts REAL NOT NULL,
+        end_ts REAL NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS sessions_end_ts ON sessions (end_ts);
+    CREATE TABLE IF NOT EXISTS summary (
+        period TEXT NOT NULL,
+        key TEXT NOT NULL,
+        sessions INTEGER NOT NULL,
+        seconds REAL NOT NULL,
+        drift_count INTEGER NOT NULL,
+        checks INTEGER NOT NULL,
+        focused_checks INTEGER NOT NULL,
+        PRIMARY KEY (period, key)
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """
+
+    def __init__(self, db_path="drift_watcher.db", state_file="agent_state.json",
+                 history_file="session_history.json"):
+        super().__init__(state_file, history_file)
+        self.db_path = db_path
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+        self._import_json_once()
+        self._build_summary_once()
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call: the agent and the server's
+        # request threads each get their own
+        db = sqlite3.connect(self.db_path, timeout=5)
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def load(self):
+        """Load state from the database."""
+        with self._connect() as db:
+            row = db.execute("SELECT data FROM state WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else self._default_state()
+
+    def save(self, state):
+        """Replace the state in one transaction."""
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO state (id, data, updated_ts) VALUES (1, ?, ?)",
+                (json.dumps(state), time.time())
+            )
+
+    def load_history(self):
+        """Load session history, oldest first."""
+        with self._connect() as db:
+            rows = db.execute("SELECT data FROM sessions ORDER BY end_ts").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def save_history(self, history):
+        """Replace the whole session history."""
+        with self._connect() as db:
+            db.execute("DELETE FROM sessions")
+            db.execute("DELETE FROM summary")
+            self._insert_sessions(db, history)
+
+    def query_history(self, limit=None, since_ts=None, before_ts=None, before_id=None):
+        """Sessions ended in [since_ts, before_ts), newest first, at most limit.
+
+        Ordered by (end_ts, id), where id is the session's row id; with
+        ``before_id`` the page starts right after (before_ts, before_id).
+        """
+        sql = "SELECT id, data FROM sessions"
+        where = []
+        params = []
+        if since_ts is not None:
+            where.append("end_ts >= ?")
+            params.append(since_ts)
+        if before_ts is not None and before_id is not None:
+            where.append("(end_ts, id) < (?, ?)")
+            params.extend((before_ts, before_id))
+        elif before_ts is not None:
+            where.append("end_ts < ?")
+            params.append(before_ts)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # The end_ts index holds the row id, so this order is an index scan
+        sql += " ORDER BY end_ts DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+        return [dict(json.loads(data), id=session_id) for session_id, data in rows]
+
+    def history_summary(self, days=30, weeks=12):
+        """All-time totals plus the latest ``days`` days and ``weeks`` ISO weeks."""
+        columns = ", ".join(SUMMARY_FIELDS)
+        with self._connect() as db:
+            total = db.execute(f"SELECT {columns} FROM summary WHERE period = 'total'").fetchone()
+            buckets = {
+                period: db.execute(
+                    f"SELECT key, {columns} FROM summary WHERE period = ? ORDER BY key DESC LIMIT ?",
+                    (period, limit)
+                ).fetchall()
+                for period, limit in (("day", days), ("week", weeks))
+            }
+        result = {"total": dict(zip(SUMMARY_FIELDS, total)) if total else self._empty_counts()}
+        for period, rows in buckets.items():
+            result[period] = [(row[0], dict(zip(SUMMARY_FIELDS, row[1:]))) for row in rows]
+        return result
+
+    def state_version(self):
+        with self._connect() as db:
+            row = db.execute("SELECT updated_ts FROM state WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def history_version(self):
+        # AUTOINCREMENT's counter grows on every insert, even after deletes
+        with self._connect() as db:
+            seq = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'sessions'").fetchone()
+            count = db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return (seq[0] if seq else 0, count)
+
+    def archive_session(self, state):
+        """Append the current session to history."""
+        if not state.get("goal") or state["goal"] == "No goal set":
+            return
+        with self._connect() as db:
+            self._insert_sessions(db, [self._session_record(state)])
+
+    @classmethod
+    def _insert_sessions(cls, db, sessions):
+        db.executemany(
+            "INSERT INTO sessions (goal, start_ts, end_ts, data) VALUES (?, ?, ?, ?)",
+            [
+                (s.get("goal", ""), s.get("start_ts", 0), s.get("end_ts", 0), json.dumps(s))
+                for s in sessions
+            ]
+        )
+        cls._add_to_summary_table(db, sessions)
+
+    @staticmethod
+    def _add_to_summary_table(db, sessions):
+        updates = ", ".join(f"{field} = {field} + excluded.{field}" for field in SUMMARY_FIELDS)
+        rows = []
+        for session in sessions:
+            counts = summary_counts(session)
+            for period, key in summary_buckets(session.get("end_ts", 0)):
+                rows.append((period, key) + tuple(counts[field] for field in SUMMARY_FIELDS))
+        db.executemany(
+            f"INSERT INTO summary (period, key, {', '.join(SUMMARY_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?) "
+            f"ON CONFLICT (period, key) DO UPDATE SET {updates}",
+            rows
+        )
+
+    def _build_summary_once(self):
+        """Summarize sessions stored before the summary table existed."""
+        with self._connect() as db:
+            db.execute("BEGIN IMMEDIATE")
+            if db.execute("SELECT 1 FROM meta WHERE key = 'summary_built'").fetchone():
+                return
+            db.execute("DELETE FROM summary")
+            rows = db.execute("SELECT data FROM sessions").fetchall()
+            self._add_to_summary_table(db, [json.loads(row[0]) for row in rows])
+            db.execute("INSERT INTO meta (key, value) VALUES ('summary_built', ?)", (str(time.time()),))
+
+    def _import_json_once(self):
+        """Copy the JSON state and history into the database on first use."""
+        with self._connect() as db:
+            # Agent and server may open the database at the same time
+            db.execute("BEGIN IMMEDIATE")
+            if db.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+            state = StateManager.load(self)
+            history = StateManager.load_history(self)
+            if Path(self.state_file).exists():
+                db.execute(
+                    "INSERT OR REPLACE INTO state (id, data, updated_ts) VALUES (1, ?, ?)",
+                    (json.dumps(state), time.time())
+                )
+            self._insert_sessions(db, history)
+            db.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (str(time.time()),))
+        if Path(self.state_file).exists() or history:
+            print(f"📦 Imported state and {len(history)} sessions from JSON into {self.db_path}")
+
+
+def build_state_manager(backend="json", state_file="agent_state.json", history_file="session_history.json",
+                        db_path="drift_watcher.db"):
+    """Build the state manager for a storage backend."""
+    if backend == "sqlite":
+        return SQLiteStateManager(db_path, state_file, history_file)
+    if backend != "json":
+        raise ValueError(f"Unknown state backend '{backend}'. Available: ['json', 'sqlite']")
+    return StateManager(state_file, history_file)
@@ -5,6 +5,20 @@ const STATE_INFO = {
 
 let currentView = 'live';
 let sessionsData = [];
+let liveData = null;
+let historyCursor = null;
+let historySummary = null;
+let pollTimer = null;
+
+// /dashboard?profile=<name> shows one profile of a multi-profile agent
+const PROFILE = new URLSearchParams(window.location.search).get('profile');
+
+function apiUrl(path, params = {}) {
+    const query = new URLSearchParams(params);
+    if (PROFILE) query.set('profile', PROFILE);
+    const qs = query.toString();
+    return qs ? `${path}?${qs}` : path;
+}
 
 function toggleSidebar() {
     const sidebar = document.getElementById('sidebar');
@@ -71,11 +85,12 @@ function formatDuration(seconds) {
 
 async function loadHistory() {
     try {
-        const response = await fetch('/api/history');
+        const response = await fetch(apiUrl('/api/history'));
         if (!response.ok) throw new Error('Failed to load history');
         
         const data = await response.json();
         sessionsData = data.sessions || [];
+        historyCursor = data.next_before;
         renderHistory();
     } catch (error) {
         document.getElementById('sidebar-content').innerHTML = `
@@ -86,6 +101,51 @@ async function loadHistory() {
     }
 }
 
+// Older sessions are fetched a page at a time, newest first
+async function loadMoreHistory() {
+    if (historyCursor === null) return;
+    try {
+        const response = await fetch(apiUrl('/api/history', {before: historyCursor}));
+        if (!response.ok) throw new Error('Failed to load history');
+
+        const data = await response.json();
+        sessionsData = sessionsData.concat(data.sessions || []);
+        historyCursor = data.next_before;
+        renderHistory();
+    } catch (error) {
+        console.error(error);
+    }
+}
+
+async function loadSummary() {
+    try {
+        const response = await fetch(apiUrl('/api/history/summary'));
+        if (!response.ok) throw new Error('Failed to load summary');
+
+        historySummary = await response.json();
+        renderHistory();
+    } catch (error) {
+        console.error(error);
+    }
+}
+
+function summaryHTML() {
+    if (!historySummary || !historySummary.weeks.length) return '';
+    const week = historySummary.weeks[0];
+    const focus = week.focus_ratio === null ? '–' : `${Math.round(week.focus_ratio * 100)}%`;
+    return `
+        <div class="history-summary">
+            <div class="session-date">Week ${week.week}</div>
+            <div class="session-meta">
+                <span>📋 ${week.sessions} sessions</span>
+                <span>⏱️ ${formatDuration(week.minutes * 60)}</span>
+                <span>🎯 ${focus}</span>
+                <span>⚠️ ${week.drift_count}</span>
+            </div>
+        </div>
+    `;
+}
+
 function renderHistory() {
     if (sessionsData.length === 0) {
         document.getElementById('sidebar-content').innerHTML = `
@@ -105,7 +165,7 @@ function renderHistory() {
         grouped[dateKey].push({ ...session, index });
     });
 
-    let html = '';
+    let html = summaryHTML();
     Object.entries(grouped).forEach(([date, sessions]) => {
         html += `
             <div class="session-group">
@@ -128,6 +188,10 @@ function renderHistory() {
         `;
     });
 
+    if (historyCursor !== null) {
+        html += `<button class="load-more" onclick="loadMoreHistory()">Load older sessions</button>`;
+    }
+
     document.getElementById('sidebar-content').innerHTML = html;
 }
 
@@ -203,14 +267,14 @@ async function loadDashboard() {
     if (refreshIcon) refreshIcon.classList.add('spinning');
     
     try {
-        const response = await fetch('/api/stats');
+        const response = await fetch(apiUrl('/api/stats'));
         
         if (!response.ok) {
             throw new Error('Failed to load stats');
         }
         
-        const data = await response.json();
-        renderDashboard(data);
+        liveData = await response.json();
+        renderDashboard(liveData);
     } catch (error) {
         dashboard.innerHTML = `
             <div class="error">
@@ -224,6 +288,20 @@ async function loadDashboard() {
     }
 }
 
+// Cached stats are as of when they were built; recompute relative times locally
+function sessionMinutes(data) {
+    if (!data.session_start_ts) return data.session_minutes;
+    return Math.max(0, Math.floor((Date.now() / 1000 - data.session_start_ts) / 60));
+}
+
+function lastCheck(data) {
+    if (!data.last_check_ts) return data.last_check;
+    const secondsAgo = Math.max(0, Math.floor(Date.now() / 1000 - data.last_check_ts));
+    if (secondsAgo < 60) return `${secondsAgo}s`;
+    if (secondsAgo < 3600) return `${Math.floor(secondsAgo / 60)}m`;
+    return `${Math.floor(secondsAgo / 3600)}h`;
+}
+
 function renderDashboard(data) {
     const stateClass = `state-${data.focus_state.toLowerCase()}`;
     const stateEmoji = data.focus_state === 'FOCUSED' ? '✅' : '⚠️';
@@ -233,6 +311,16 @@ function renderDashboard(data) {
     const irrelevantPct = Math.round(data.irrelevant_percent || 0);
     const hasBreakdown = relevantPct + irrelevantPct > 0;
 
+    const fingerprint = data.fingerprint || {};
+    const fingerprintLookups = (fingerprint.hits || 0) + (fingerprint.misses || 0);
+    const reuseHTML = fingerprintLookups > 0 ? `
+            <div class="card">
+                <div class="card-title">Unchanged Windows</div>
+                <div class="card-value">${Math.round(fingerprint.hit_rate * 100)}%</div>
+                <div class="card-subtitle">${fingerprint.hits} of ${fingerprintLookups} verdicts reused</div>
+            </div>
+    ` : '';
+
     const breakdownHTML = hasBreakdown ? `
         <div class="activity-item">
             <span class="activity-label">Relevant</span>
@@ -290,15 +378,16 @@ function renderDashboard(data) {
 
             <div class="card">
                 <div class="card-title">Session Time</div>
-                <div class="card-value">${data.session_minutes}m</div>
+                <div class="card-value">${sessionMinutes(data)}m</div>
                 <div class="card-subtitle">Active monitoring time</div>
             </div>
 
             <div class="card">
                 <div class="card-title">Last Check</div>
-                <div class="card-value">${data.last_check}</div>
+                <div class="card-value">${lastCheck(data)}</div>
                 <div class="card-subtitle">Time since last assessment</div>
             </div>
+            ${reuseHTML}
 
             ${hasBreakdown ? `
             <div class="card" style="grid-column: 1 / -1;">
@@ -312,13 +401,56 @@ function renderDashboard(data) {
     `;
 }
 
-// Auto-refresh every 30 seconds (only for live view)
+// Fallback when the stream is unavailable: refresh every 30 seconds (only for live view)
+function startPolling() {
+    if (pollTimer) return;
+    pollTimer = setInterval(() => {
+        if (currentView === 'live') {
+            loadDashboard();
+        }
+    }, 30000);
+}
+
+// Server pushes stats/history as soon as the agent saves a new assessment
+function subscribe() {
+    if (!window.EventSource) {
+        startPolling();
+        return;
+    }
+    const stream = new EventSource(apiUrl('/api/stream'));
+    stream.addEventListener('stats', (event) => {
+        liveData = JSON.parse(event.data);
+        if (currentView === 'live') {
+            renderDashboard(liveData);
+        }
+    });
+    stream.addEventListener('history', (event) => {
+        const data = JSON.parse(event.data);
+        sessionsData = data.sessions || [];
+        historyCursor = data.next_before;
+        renderHistory();
+    });
+    stream.addEventListener('summary', (event) => {
+        historySummary = JSON.parse(event.data);
+        renderHistory();
+    });
+    stream.onopen = () => {
+        clearInterval(pollTimer);
+        pollTimer = null;
+    };
+    // EventSource reconnects on its own; poll meanwhile
+    stream.onerror = startPolling;
+}
+
+// Keep "last check" and session time ticking between pushes, without fetching
 setInterval(() => {
-    if (currentView === 'live') {
-        loadDashboard();
+    if (currentView === 'live' && liveData) {
+        renderDashboard(liveData);
     }
-}, 30000);
+}, 10000);
 
 // Initial load
 loadHistory();
+loadSummary();
 loadDashboard();
+subscribe();
@@ -0,0 +1,5 @@
+from .fingerprint import WindowFingerprints
+from .prescorer import RelevancePrescorer
+from .rules import RulesEngine
+
+__all__ = ["RelevancePrescorer", "RulesEngine", "WindowFingerprints"]
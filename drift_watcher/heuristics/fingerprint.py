@@ -0,0 +1,89 @@
+import hashlib
+import time
+from collections import OrderedDict
+
+from ..utils.urls import normalize_url
+
+
+class WindowFingerprints:
+    """Reuses the verdict of a recent window with the same activity.
+
+    A window's fingerprint hashes the goal with each page's normalized URL
+    and its share of the window time, bucketed into ``duration_buckets``
+    steps, so a tab that simply stays in focus produces the same
+    fingerprint tick after tick. A matching verdict is reused for at most
+    ``max_reuse_seconds`` after the assessment that produced it.
+    """
+
+    name = "fingerprint"
+
+    def __init__(self, max_reuse_seconds=300, duration_buckets=5, max_entries=256):
+        self.max_reuse_seconds = max_reuse_seconds
+        self.duration_buckets = duration_buckets
+        self.max_entries = max_entries
+        self._verdicts = OrderedDict()   # fingerprint -> (result, ts)
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @classmethod
+    def from_config(cls, fingerprint_config):
+        options = {k: v for k, v in fingerprint_config.items() if k != "enabled"}
+        return cls(**options)
+
+    def fingerprint(self, goal, activity_summary) -> str:
+        pages = activity_summary.get("pages", [])
+        total = sum(p.get("duration_min", 0.0) for p in pages) or 1.0
+        shares = {}
+        for page in pages:
+            url = normalize_url(page.get("url", ""), drop_timestamps=True)
+            shares[url] = shares.get(url, 0.0) + page.get("duration_min", 0.0) / total
+        parts = [goal.strip().lower()] + sorted(
+            f"{url}|{round(share * self.duration_buckets)}" for url, share in shares.items()
+        )
+        return hashlib.sha1("\n".join(parts).encode()).hexdigest()
+
+    def assess(self, goal, activity_summary):
+        """Return the stored verdict of an identical recent window, else None."""
+        if not activity_summary.get("pages"):
+            return None
+        key = self.fingerprint(goal, activity_summary)
+        entry = self._verdicts.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        result, ts = entry
+        age = time.time() - ts
+        if age > self.max_reuse_seconds:
+            del self._verdicts[key]
+            self.expired += 1
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._verdicts.move_to_end(key)
+        reused = dict(result)
+        reused["source"] = self.name
+        reused["reused_from"] = result.get("source", "llm")
+        reused["reused_age_s"] = int(age)
+        return reused
+
+    def record(self, goal, activity_summary, result):
+        """Remember a fresh verdict for this window's fingerprint."""
+        if not activity_summary.get("pages") or result.get("source") == self.name:
+            return
+        key = self.fingerprint(goal, activity_summary)
+        self._verdicts[key] = (dict(result), time.time())
+        self._verdicts.move_to_end(key)
+        while len(self._verdicts) > self.max_entries:
+            self._verdicts.popitem(last=False)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "expired": self.expired,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,167 @@
+import re
+import threading
+import zlib
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install "drift-watcher[local]"
+    np = None
+
+from ..llm.reasoner import LLMReasoner
+from ..utils.urls import normalize_url
+
+
+STOPWORDS = {
+    "the", "and", "for", "with", "you", "your", "are", "how", "what", "this",
+    "that", "from", "www", "com", "org", "net", "http", "https", "html", "index",
+    "about", "into", "of", "to", "in", "on",
+}
+_WORD = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    # Single ASCII characters are noise, but one CJK character is a word
+    return [t for t in _WORD.findall(text.lower()) if (len(t) > 1 or not t.isascii()) and t not in STOPWORDS]
+
+
+class RelevancePrescorer:
+    """Cheap local relevance scorer using hashed TF-IDF vectors.
+
+    The goal and each page (title, URL tokens, content snippet) are hashed
+    into fixed-size vectors; document frequencies accumulate over every
+    distinct page (by URL) seen. All pages of a window are scored against the goal with one
+    matrix-vector product. Pages above ``relevant_similarity`` count as
+    relevant, below ``irrelevant_similarity`` as irrelevant; a window is
+    settled locally only when one side holds at least its share of the
+    window time, otherwise it is left for the LLM, as is any window whose
+    goal has no usable terms.
+    """
+
+    name = "prescorer"
+
+    def __init__(self, relevant_similarity=0.15, irrelevant_similarity=0.02,
+                 focused_share=0.8, drifting_share=0.8, dimensions=2 ** 14, max_seen_pages=10000):
+        if np is None:
+            raise ImportError("The local prescorer needs numpy: pip install 'drift-watcher[local]'")
+        self.relevant_similarity = relevant_similarity
+        self.irrelevant_similarity = irrelevant_similarity
+        self.focused_share = focused_share
+        self.drifting_share = drifting_share
+        self.dimensions = dimensions
+        self._doc_freq = np.zeros(dimensions, dtype=np.float32)
+        self._docs = 0
+        # Pages already counted, least recently seen first; a page evicted
+        # here is counted again when it comes back
+        self._seen_urls = OrderedDict()
+        self.max_seen_pages = max_seen_pages
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, prescorer_config):
+        options = {k: v for k, v in prescorer_config.items() if k != "enabled"}
+        return cls(**options)
+
+    def _hash(self, tokens):
+        return np.fromiter(
+            (zlib.crc32(t.encode()) % self.dimensions for t in tokens),
+            dtype=np.int64,
+            count=len(tokens)
+        )
+
+    @staticmethod
+    def page_text(page):
+        return " ".join([
+            page.get("title", ""),
+            page.get("url", ""),
+            (page.get("content") or "")[:300],
+        ])
+
+    def similarities(self, goal, pages):
+        """Cosine similarity between the goal and every page, as one array.
+
+        Returns None when the goal has no terms left after tokenizing.
+        """
+        with self._lock:
+            return self._similarities(goal, pages)
+
+    def _similarities(self, goal, pages):
+        docs = [self._hash(tokenize(self.page_text(p))) for p in pages]
+
+        # Term counts for all pages in one scatter-add
+        rows = np.repeat(np.arange(len(docs)), [len(d) for d in docs])
+        cols = np.concatenate(docs) if docs else np.zeros(0, dtype=np.int64)
+        counts = np.zeros((len(docs), self.dimensions), dtype=np.float32)
+        np.add.at(counts, (rows, cols), 1.0)
+
+        # Count each page once, or the pages worked on most drift towards zero IDF
+        new = [i for i, p in enumerate(pages) if self._first_sighting(p)]
+        if new:
+            self._doc_freq += (counts[new] > 0).sum(axis=0)
+            self._docs += len(new)
+        idf = np.log((1.0 + self._docs) / (1.0 + self._doc_freq)) + 1.0
+
+        matrix = np.log1p(counts) * idf
+        goal_vec = np.zeros(self.dimensions, dtype=np.float32)
+        np.add.at(goal_vec, self._hash(tokenize(goal)), 1.0)
+        goal_vec = np.log1p(goal_vec) * idf
+        goal_norm = np.linalg.norm(goal_vec)
+        if goal_norm == 0:
+            return None
+
+        norms = np.linalg.norm(matrix, axis=1) * goal_norm
+        norms[norms == 0] = 1.0
+        return (matrix @ goal_vec) / norms
+
+    def _first_sighting(self, page):
+        key = normalize_url(page.get("url") or "") or page.get("title", "")
+        if key in self._seen_urls:
+            self._seen_urls.move_to_end(key)
+            return False
+        self._seen_urls[key] = None
+        while len(self._seen_urls) > self.max_seen_pages:
+            self._seen_urls.popitem(last=False)
+        return True
+
+    def assess(self, goal, activity_summary):
+        """Return a local assessment for clearly focused/drifting windows, else None."""
+        pages = activity_summary.get("pages", [])
+        if not pages:
+            return None
+
+        sims = self.similarities(goal, pages)
+        if sims is None:
+            return None
+        durations = np.array([p.get("duration_min", 0.0) for p in pages], dtype=np.float32)
+        total = float(durations.sum()) or 1.0
+        relevant_share = float(durations[sims >= self.relevant_similarity].sum()) / total
+        irrelevant_share = float(durations[sims <= self.irrelevant_similarity].sum()) / total
+
+        if relevant_share >= self.focused_share:
+            reason = f"Local scorer: {round(relevant_share * 100)}% of time on pages similar to the goal"
+        elif irrelevant_share >= self.drifting_share:
+            reason = f"Local scorer: {round(irrelevant_share * 100)}% of time on pages unrelated to the goal"
+        else:
+            return None
+
+        return LLMReasoner.verdict_from_relevance(
+            pages,
+            [bool(s >= self.relevant_similarity) for s in sims],
+            reason=reason,
+            source=self.name
+        )
+
+    def estimate(self, goal, activity_summary):
+        """Best-effort verdict from page similarities, without the share thresholds."""
+        pages = activity_summary.get("pages", [])
+        if not pages:
+            return None
+        sims = self.similarities(goal, pages)
+        if sims is None:
+            return None
+        return LLMReasoner.verdict_from_relevance(
+            pages,
+            [bool(s >= self.relevant_similarity) for s in sims],
+            reason="Local scorer estimate",
+            source=self.name
+        )
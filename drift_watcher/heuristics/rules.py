@@ -0,0 +1,426 @@
+import fnmatch
+import re
+from collections import deque
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+from ..llm.reasoner import LLMReasoner
+from ..utils.urls import domain_of
+
+
+VERDICTS = ("relevant", "irrelevant")
+_LEADING_FLAGS = re.compile(r"^\(\?([aiLmsux]+)\)")
+
+
+class DomainTrie:
+    """Maps domain suffixes to rule indexes; lookups walk the host's labels right to left."""
+
+    def __init__(self):
+        self._root = {}
+
+    def add(self, suffix, rule_index):
+        node = self._root
+        for label in reversed(suffix.lower().strip(".").split(".")):
+            node = node.setdefault(label, {})
+        node.setdefault("$", rule_index)
+
+    def match(self, host):
+        """Return the rule index of the longest suffix matching host, or None."""
+        node, found = self._root, None
+        for label in reversed(host.split(".")):
+            node = node.get(label)
+            if node is None:
+                break
+            found = node.get("$", found)
+        return found
+
+
+class KeywordAutomaton:
+    """Aho-Corasick automaton over lowercased literals.
+
+    ``find`` reports the value of every literal occurring in a text in one
+    pass over it, however many literals were added.
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+    def __bool__(self):
+        return len(self._goto) > 1
+
+    def add(self, literal, value):
+        state = 0
+        for char in literal:
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(value)
+
+    def build(self):
+        """Compute failure links; call once after the last ``add``."""
+        # The root's children fail to the root, which is where they start
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        state = 0
+        found = []
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            if self._out[state]:
+                found.extend(self._out[state])
+        return found
+
+
+class PatternSet:
+    """Patterns of one kind (titles, or URL globs without a literal host).
+
+    Plain literals and the literal each regex requires go into one
+    ``KeywordAutomaton``, so a text is scanned once whatever the number of
+    rules and only the regexes whose literal occurs are run. Regexes with
+    no usable literal share one alternation, except those with groups of
+    their own: they run separately, so group names and backreferences
+    cannot collide. ``first`` returns the earliest matching rule.
+    """
+
+    MIN_LITERAL = 3
+
+    def __init__(self, flags=0, search=True):
+        self.flags = flags
+        self.search = search
+        self.automaton = KeywordAutomaton()
+        self.literals = set()    # rule indexes settled by their literal alone
+        self.prefiltered = {}    # rule index -> compiled regex, run when its literal occurs
+        self.separate = []       # (rule index, compiled regex) with their own groups
+        self.joined = None
+        self._joined_parts = []
+
+    def add_literal(self, literal, index):
+        self.automaton.add(literal.lower(), index)
+        self.literals.add(index)
+
+    def add_regex(self, pattern, index, literal=""):
+        compiled = re.compile(pattern, self.flags)
+        if len(literal) >= self.MIN_LITERAL:
+            self.automaton.add(literal.lower(), index)
+            self.prefiltered[index] = compiled
+        elif compiled.groups:
+            self.separate.append((index, compiled))
+        else:
+            self._joined_parts.append(f"(?P<r{index}>{_scoped(pattern)})")
+
+    def build(self):
+        self.automaton.build()
+        if self._joined_parts:
+            self.joined = re.compile("|".join(self._joined_parts), self.flags)
+        return self
+
+    def _matches(self, regex, text):
+        return regex.search(text) if self.search else regex.match(text)
+
+    def first(self, text):
+        best = None
+        candidates = set()
+        if self.automaton:
+            for index in self.automaton.find(text.lower()):
+                if index in self.literals:
+                    best = index if best is None else min(best, index)
+                else:
+                    candidates.add(index)
+        for index, regex in sorted((i, self.prefiltered[i]) for i in candidates):
+            if best is not None and index >= best:
+                break
+            if self._matches(regex, text):
+                best = index
+                break
+        for index, regex in self.separate:
+            if best is not None and index >= best:
+                break
+            if self._matches(regex, text):
+                best = index
+                break
+        if self.joined is not None:
+            m = self._matches(self.joined, text)
+            if m:
+                index = int(m.lastgroup[1:])
+                best = index if best is None else min(best, index)
+        return best
+
+
+class CompiledRules:
+    """One goal's rules compiled into indexes.
+
+    - domain suffixes go into a ``DomainTrie``;
+    - URL globs with a literal host are bucketed per host, so a page only
+      runs the globs written for its host; the rest go into a
+      ``PatternSet`` keyed on each glob's longest literal run;
+    - title patterns that are whole-word phrases (``\\bword word\\b``) go
+      into a keyword index matched against the title's word n-grams; the
+      rest go into a ``PatternSet``, plain strings as literals.
+
+    Matching cost depends on the length of the page's title and URL and
+    on the rules whose literals occur in them, not on the number of rules.
+    Within a kind the earliest rule wins. Across kinds URL globs take
+    precedence over domain suffixes, which take precedence over titles.
+    """
+
+    MAX_KEYWORD_WORDS = 5
+
+    def __init__(self, rules):
+        self.rules = rules
+        self.domains = DomainTrie()
+        self.keywords = {}
+        self.urls = PatternSet(search=False)
+        self.titles = PatternSet(flags=re.IGNORECASE)
+        host_parts = {}
+
+        for i, rule in enumerate(rules):
+            if "domain" in rule:
+                self.domains.add(rule["domain"], i)
+            elif "url" in rule:
+                host = _literal_host(rule["url"])
+                if host:
+                    host_parts.setdefault(host, []).append(f"(?P<r{i}>{fnmatch.translate(rule['url'])})")
+                else:
+                    self.urls.add_regex(fnmatch.translate(rule["url"]), i, _glob_literal(rule["url"]))
+            elif "title" in rule:
+                phrase = _keyword_phrase(rule["title"])
+                literal = _plain_literal(rule["title"])
+                if phrase:
+                    self.keywords.setdefault(phrase, i)
+                elif literal:
+                    self.titles.add_literal(literal, i)
+                else:
+                    self.titles.add_regex(rule["title"], i, _required_literal(rule["title"]))
+
+        self.host_regexes = {host: re.compile("|".join(parts)) for host, parts in host_parts.items()}
+        self.urls.build()
+        self.titles.build()
+        self.keyword_words = max((len(k.split()) for k in self.keywords), default=0)
+
+    def match(self, page):
+        """Return the verdict of the first rule matching a page, or None."""
+        url = page.get("url", "")
+
+        index = self._match_url(url)
+        if index is None:
+            index = self.domains.match(domain_of(url))
+        if index is None:
+            index = self._match_title(page.get("title", ""))
+        return None if index is None else self.rules[index]["verdict"]
+
+    def _match_url(self, url):
+        found = []
+        host_regex = self.host_regexes.get(_url_host(url))
+        if host_regex is not None:
+            m = host_regex.match(url)
+            if m:
+                found.append(int(m.lastgroup[1:]))
+        index = self.urls.first(url)
+        if index is not None:
+            found.append(index)
+        return min(found, default=None)
+
+    def _match_title(self, title):
+        found = []
+        if self.keywords:
+            words = re.findall(r"\w+", title.lower())
+            for n in range(1, min(self.keyword_words, self.MAX_KEYWORD_WORDS) + 1):
+                for start in range(len(words) - n + 1):
+                    index = self.keywords.get(" ".join(words[start:start + n]))
+                    if index is not None:
+                        found.append(index)
+        index = self.titles.first(title)
+        if index is not None:
+            found.append(index)
+        return min(found, default=None)
+
+
+def _url_host(url):
+    """Lowercased scheme-less host[:port] of a URL, as written."""
+    m = re.match(r"^[a-zA-Z][\w+.-]*://([^/?#]+)", url)
+    return m.group(1).lower() if m else ""
+
+
+def _literal_host(glob):
+    """Host of a URL glob when it has no wildcard in it, else None."""
+    host = _url_host(glob)
+    if not host or any(c in host for c in "*?["):
+        return None
+    return host
+
+
+def _keyword_phrase(pattern):
+    """Return the phrase of a ``\\bword word\\b`` pattern (lowercased), else None."""
+    m = re.fullmatch(r"(?:\(\?i\))?\\b([A-Za-z0-9_]+(?: [A-Za-z0-9_]+)*)\\b", pattern)
+    if not m or len(m.group(1).split()) > CompiledRules.MAX_KEYWORD_WORDS:
+        return None
+    return m.group(1).lower()
+
+
+def _glob_literal(glob):
+    """Longest run of a URL glob outside its wildcards and character classes."""
+    return max(re.split(r"\[[^\]]*\]|[*?]", glob), key=len)
+
+
+def _plain_literal(pattern):
+    """The text of a pattern that is nothing but literal characters, else None."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+    if not parsed or any(op is not sre_parse.LITERAL for op, _ in parsed):
+        return None
+    return "".join(chr(av) for _, av in parsed)
+
+
+def _required_literal(pattern):
+    """Longest run of literal characters every match of a regex contains, or ""."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return ""
+    best = run = ""
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run += chr(av)
+        else:
+            best, run = max(best, run, key=len), ""
+    return max(best, run, key=len)
+
+
+def _scoped(pattern):
+    """Turn a leading global flag group like ``(?i)`` into ``(?i:...)`` so patterns can be joined."""
+    m = _LEADING_FLAGS.match(pattern)
+    if m:
+        return f"(?{m.group(1)}:{pattern[m.end():]})"
+    return f"(?:{pattern})"
+
+
+class RulesEngine:
+    """Classifies pages with configured allow/deny rules ahead of the LLM.
+
+    Rules come from the ``rules`` section of config.json::
+
+        "rules": {
+            "min_coverage": 0.8,
+            "entries": [
+                {"domain": "github.com", "verdict": "relevant", "goals": ["python"]},
+                {"url": "http://localhost:*", "verdict": "relevant"},
+                {"title": "(?i)shorts", "verdict": "irrelevant"}
+            ]
+        }
+
+    A rule without ``goals`` applies to every goal; otherwise to goals that
+    contain one of the listed strings (case-insensitive). When matched pages
+    cover at least ``min_coverage`` of the window time the verdict is
+    computed locally, counting unmatched pages as irrelevant.
+    """
+
+    name = "rules"
+
+    def __init__(self, entries=None, min_coverage=0.8):
+        self.entries = [self._validate(i, rule) for i, rule in enumerate(entries or [])]
+        self.min_coverage = min_coverage
+        self._compiled = {}
+
+    @classmethod
+    def from_config(cls, rules_config):
+        return cls(
+            entries=rules_config.get("entries", []),
+            min_coverage=rules_config.get("min_coverage", 0.8)
+        )
+
+    @staticmethod
+    def _validate(index, rule):
+        kinds = [k for k in ("domain", "url", "title") if k in rule]
+        if len(kinds) != 1:
+            raise ValueError(f"Rule {index} needs exactly one of 'domain', 'url' or 'title': {rule}")
+        if rule.get("verdict") not in VERDICTS:
+            raise ValueError(f"Rule {index} verdict must be one of {list(VERDICTS)}: {rule}")
+        if "title" in rule:
+            re.compile(rule["title"])
+        return rule
+
+    def compiled_for(self, goal):
+        """Compile (once per goal) the rules that apply to a goal."""
+        compiled = self._compiled.get(goal)
+        if compiled is None:
+            goal_lower = goal.lower()
+            applicable = [
+                rule for rule in self.entries
+                if not rule.get("goals") or any(g.lower() in goal_lower for g in rule["goals"])
+            ]
+            compiled = CompiledRules(applicable)
+            self._compiled[goal] = compiled
+        return compiled
+
+    def classify(self, goal, pages):
+        """Return a verdict ("relevant", "irrelevant" or None) per page."""
+        compiled = self.compiled_for(goal)
+        return [compiled.match(page) for page in pages]
+
+    def assess(self, goal, activity_summary):
+        """Return a local assessment if rules cover enough of the window, else None."""
+        pages = activity_summary.get("pages", [])
+        if not pages or not self.entries:
+            return None
+
+        verdicts = self.classify(goal, pages)
+        total = sum(p.get("duration_min", 0.0) for p in pages) or 1.0
+        covered = sum(p.get("duration_min", 0.0) for p, v in zip(pages, verdicts) if v)
+        coverage = covered / total
+        if coverage < self.min_coverage:
+            return None
+
+        result = LLMReasoner.verdict_from_relevance(
+            pages,
+            [v == "relevant" for v in verdicts],
+            reason=f"Rules matched {round(coverage * 100)}% of window time",
+            source=self.name
+        )
+        result["rules_coverage"] = round(coverage, 2)
+        return result
+
+    def estimate(self, goal, activity_summary):
+        """Best-effort verdict from the matched pages alone.
+
+        Confidence is scaled by the share of window time the matched pages
+        cover, so a few matched pages cannot reach the drift threshold.
+        """
+        pages = activity_summary.get("pages", [])
+        verdicts = self.classify(goal, pages) if self.entries else []
+        matched = [(p, v) for p, v in zip(pages, verdicts) if v]
+        if not matched:
+            return None
+        total = sum(p.get("duration_min", 0.0) for p in pages) or 1.0
+        coverage = sum(p.get("duration_min", 0.0) for p, _ in matched) / total
+        result = LLMReasoner.verdict_from_relevance(
+            [p for p, _ in matched],
+            [v == "relevant" for _, v in matched],
+            reason=f"Rules estimate from {len(matched)} of {len(pages)} pages",
+            source=self.name
+        )
+        result["confidence"] = round(result["confidence"] * coverage, 2)
+        result["rules_coverage"] = round(coverage, 2)
+        return result
@@ -1,6 +1,9 @@
 from .base import BaseLLMClient
 from .bedrock_client import BedrockClient
 from .ollama_client import OllamaClient
+from .prompt_builder import PromptBuilder
 from .reasoner import LLMReasoner
+from .relevance_cache import RelevanceCache
+from .streaming import IncrementalJSONParser
 
-__all__ = ["BaseLLMClient", "BedrockClient", "OllamaClient", "LLMReasoner"]
+__all__ = ["BaseLLMClient", "BedrockClient", "OllamaClient", "LLMReasoner", "PromptBuilder", "RelevanceCache", "IncrementalJSONParser"]
@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
 from typing import Dict, Any
 
+from ..utils.metrics import METRICS
+
+JSON_FALLBACKS = METRICS.counter(
+    "drift_watcher_llm_json_fallback_total",
+    "LLM responses that were not plain JSON and went through the regex fallback",
+    ["provider", "outcome"]
+)
+
 
 class BaseLLMClient(ABC):
     """Abstract base class for LLM clients."""
@@ -1,14 +1,17 @@
 import boto3
 import json
-from .base import BaseLLMClient
+from .base import JSON_FALLBACKS, BaseLLMClient
+from .streaming import IncrementalJSONParser
 
 
 class BedrockClient(BaseLLMClient):
     """AWS Bedrock client wrapper for LLM interactions."""
     
-    def __init__(self, model_id="anthropic.claude-3-5-sonnet-20240620-v1:0", region_name="us-east-1"):
+    def __init__(self, model_id="anthropic.claude-3-5-sonnet-20240620-v1:0", region_name="us-east-1", stream=True):
         self.model_id = model_id
         self.region_name = region_name
+        self.stream = stream
+        self.last_usage = {}
         self.client = boto3.client(
             service_name="bedrock-runtime",
             region_name=region_name
@@ -32,15 +35,26 @@ class BedrockClient(BaseLLMClient):
             "temperature": temperature
         }
         
-        response = self.client.invoke_model(
-            modelId=self.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(body)
-        )
-        
-        raw = json.loads(response["body"].read())
-        text = raw["content"][0]["text"]
+        self.last_usage = {}
+        if self.stream:
+            result, text = self._invoke_streaming(body)
+            if result is not None:
+                return result
+        else:
+            response = self.client.invoke_model(
+                modelId=self.model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=json.dumps(body)
+            )
+
+            raw = json.loads(response["body"].read())
+            text = raw["content"][0]["text"]
+            usage = raw.get("usage", {})
+            self.last_usage = {
+                "prompt_tokens": usage.get("input_tokens"),
+                "completion_tokens": usage.get("output_tokens"),
+            }
         print(f"🔍 Raw LLM response: {text[:300]}")
         
         try:
@@ -49,5 +63,44 @@ class BedrockClient(BaseLLMClient):
             import re
             json_match = re.search(r'\{.*\}', text, re.DOTALL)
             if json_match:
-                return json.loads(json_match.group(0))
+                try:
+                    result = json.loads(json_match.group(0))
+                    JSON_FALLBACKS.inc(provider=self.name, outcome="recovered")
+                    return result
+                except json.JSONDecodeError:
+                    pass
+            JSON_FALLBACKS.inc(provider=self.name, outcome="failed")
             raise
+
+    def _invoke_streaming(self, body):
+        """Stream the completion and stop as soon as a complete verdict object arrives.
+
+        Returns (parsed object or None, full text received).
+        """
+        parser = IncrementalJSONParser()
+        response = self.client.invoke_model_with_response_stream(
+            modelId=self.model_id,
+            contentType="application/json",
+            accept="application/json",
+            body=json.dumps(body)
+        )
+        stream = response["body"]
+        try:
+            for event in stream:
+                chunk = event.get("chunk")
+                if not chunk:
+                    continue
+                payload = json.loads(chunk["bytes"])
+                if payload.get("type") == "message_start":
+                    usage = payload.get("message", {}).get("usage", {})
+                    self.last_usage["prompt_tokens"] = usage.get("input_tokens")
+                elif payload.get("type") == "message_delta":
+                    self.last_usage["completion_tokens"] = payload.get("usage", {}).get("output_tokens")
+                if payload.get("type") != "content_block_delta":
+                    continue
+                if parser.feed(payload["delta"].get("text", "")) is not None:
+                    break
+        finally:
+            # Closing the event stream drops the connection mid-generation
+            stream.close()
+        return parser.result, parser.text
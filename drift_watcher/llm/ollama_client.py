@@ -1,39 +1,91 @@
 from ollama import Client
+import httpx
 import json
-from .base import BaseLLMClient
+import time
+from .base import JSON_FALLBACKS, BaseLLMClient
+from .streaming import IncrementalJSONParser
+
+NS = 1e9
+
 
 class OllamaClient(BaseLLMClient):
-    def __init__(self, model="qwen2.5:latest", base_url="http://localhost:11434", **kwargs):
+    def __init__(self, model="qwen2.5:latest", base_url="http://localhost:11434", keep_alive="30m",
+                 warm_up=True, max_connections=4, stream=True, num_ctx=4096, **kwargs):
         """Initialize Ollama client.
-        
+
         Args:
             model: Model name (e.g., "qwen2.5:latest")
             base_url: Ollama server URL
+            keep_alive: How long Ollama keeps the model loaded after a call
+                (e.g. "30m", seconds as a number, or -1 for forever)
+            warm_up: Preload the model when the agent starts
+            max_connections: Size of the persistent HTTP connection pool
+            stream: Stream the completion and stop once the JSON verdict is complete
+            num_ctx: Context window; prompt plus max output tokens must fit
             **kwargs: Additional arguments (for backward compatibility)
         """
         self.model = model
         self.base_url = base_url
-        self.client = Client(host=base_url)
+        self.keep_alive = keep_alive
+        self.warm_up_on_start = warm_up
+        self.stream = stream
+        self.num_ctx = num_ctx
+        self.last_timings = {}
+        self.last_usage = {}
+        # One pooled httpx client for the agent's lifetime; connections are
+        # kept open between windows instead of reconnecting every call
+        self.client = Client(
+            host=base_url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=None,
+            ),
+        )
 
     @property
     def name(self) -> str:
         return f"Ollama ({self.model})"
-    
+
+    def warm_up(self) -> dict:
+        """Load the model into memory ahead of the first window.
+
+        An empty prompt makes Ollama load the model and return without
+        generating; ``keep_alive`` then keeps it resident between ticks.
+        """
+        start = time.perf_counter()
+        response = self.client.generate(model=self.model, prompt="", keep_alive=self.keep_alive)
+        timings = self._timings(response, time.perf_counter() - start)
+        self.last_timings = timings
+        return timings
+
     def invoke(self, prompt: str, max_tokens: int = 500, temperature: float = 0.2) -> dict:
         """Invoke Ollama and return parsed JSON response."""
-        response = self.client.generate(
-            model=self.model,
-            prompt=prompt,
-            options={
-                "temperature": temperature,
-                "num_predict": max_tokens,  # max output tokens
-                "num_ctx": 4096,            # context window
-            }
-        )
-        
-        # Extract response text from GenerateResponse object
-        response_text = response['response'] if isinstance(response, dict) else response.response
-        
+        options = {
+            "temperature": temperature,
+            "num_predict": max_tokens,  # max output tokens
+            "num_ctx": self.num_ctx,    # context window
+        }
+        start = time.perf_counter()
+        self.last_usage = {}
+        if self.stream:
+            result, response_text = self._invoke_streaming(prompt, options, start)
+            if result is not None:
+                return result
+        else:
+            response = self.client.generate(
+                model=self.model,
+                prompt=prompt,
+                options=options,
+                keep_alive=self.keep_alive
+            )
+            self.last_timings = self._timings(response, time.perf_counter() - start)
+            self.last_usage = self._usage(response)
+            self._print_timings()
+
+            # Extract response text from GenerateResponse object
+            response_text = response['response'] if isinstance(response, dict) else response.response
+
         # Try to extract JSON from response (handle reasoning models that add text)
         try:
             # First try direct parse
@@ -44,9 +96,89 @@ class OllamaClient(BaseLLMClient):
             json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response_text)
             if json_match:
                 try:
-                    return json.loads(json_match.group(0))
+                    result = json.loads(json_match.group(0))
+                    JSON_FALLBACKS.inc(provider=self.name, outcome="recovered")
+                    return result
                 except json.JSONDecodeError:
                     pass
-            
+
+            JSON_FALLBACKS.inc(provider=self.name, outcome="failed")
             print(f"⚠️ Failed to parse JSON from response: {response_text[:200]}")
-            raise ValueError(f"Invalid JSON response from LLM. Response: {response_text[:500]}")
\ No newline at end of file
+            raise ValueError(f"Invalid JSON response from LLM. Response: {response_text[:500]}")
+
+    def _invoke_streaming(self, prompt, options, start):
+        """Stream the completion and stop as soon as a complete verdict object arrives.
+
+        Returns (parsed object or None, full text received).
+        """
+        parser = IncrementalJSONParser()
+        first_token = None
+        final = None
+        chunks = self.client.generate(
+            model=self.model,
+            prompt=prompt,
+            options=options,
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        try:
+            for chunk in chunks:
+                piece = chunk['response'] if isinstance(chunk, dict) else chunk.response
+                if piece and first_token is None:
+                    first_token = time.perf_counter() - start
+                if (chunk['done'] if isinstance(chunk, dict) else chunk.done):
+                    final = chunk
+                if piece and parser.feed(piece) is not None:
+                    break
+        finally:
+            # Closing the stream drops the connection, which cancels the
+            # generation on the Ollama side
+            chunks.close()
+
+        wall = time.perf_counter() - start
+        if final is not None:
+            self.last_timings = self._timings(final, wall)
+            self.last_usage = self._usage(final)
+        else:
+            self.last_timings = {"load_s": None, "ttft_s": None, "eval_s": None,
+                                 "total_s": round(wall, 3), "wall_s": round(wall, 3)}
+        if first_token is not None:
+            self.last_timings["ttft_s"] = round(first_token, 3)
+        self.last_timings["stopped_early"] = final is None and parser.result is not None
+        self._print_timings()
+        return parser.result, parser.text
+
+    def _print_timings(self):
+        t = self.last_timings
+        load = f"{t['load_s']}s" if t.get("load_s") is not None else "n/a"
+        early = " (stopped at complete JSON)" if t.get("stopped_early") else ""
+        print(f"⏱️ Ollama: load {load} | first token {t['ttft_s']}s | total {t['total_s']}s{early}")
+
+    @staticmethod
+    def _usage(response) -> dict:
+        """Token counts Ollama reports with the final response."""
+        def count(field):
+            return response.get(field) if isinstance(response, dict) else getattr(response, field, None)
+
+        return {"prompt_tokens": count("prompt_eval_count"), "completion_tokens": count("eval_count")}
+
+    @staticmethod
+    def _timings(response, wall_seconds) -> dict:
+        """Latency breakdown from Ollama's response durations (reported in ns).
+
+        Time to first token is the model load plus prompt evaluation, i.e.
+        everything before the first output token is generated.
+        """
+        def duration(field):
+            value = response.get(field) if isinstance(response, dict) else getattr(response, field, None)
+            return (value or 0) / NS
+
+        load = duration("load_duration")
+        prompt_eval = duration("prompt_eval_duration")
+        return {
+            "load_s": round(load, 3),
+            "ttft_s": round(load + prompt_eval, 3),
+            "eval_s": round(duration("eval_duration"), 3),
+            "total_s": round(duration("total_duration") or wall_seconds, 3),
+            "wall_s": round(wall_seconds, 3),
+        }
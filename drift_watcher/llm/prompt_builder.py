@@ -0,0 +1,78 @@
+import math
+
+from ..utils.urls import normalize_url
+
+
+class PromptBuilder:
+    """Builds the focus assessment prompt within a token budget.
+
+    Pages are merged on their normalized URL (tracking parameters,
+    fragments and playback timestamps removed), so the same video watched
+    at different positions is one page with the summed time; the prompt
+    still shows the URL as visited. The prompt is
+    then filled with pages in order of time spent until the estimated token
+    count would exceed ``token_budget``; the lowest-time pages are the ones
+    left out.
+    """
+
+    CHARS_PER_TOKEN = 4
+    MAX_URL_CHARS = 120
+
+    def __init__(self, token_budget=2048, content_chars=150):
+        self.token_budget = token_budget
+        self.content_chars = content_chars
+
+    @classmethod
+    def estimate_tokens(cls, text: str) -> int:
+        """Rough token count (~4 characters per token for English/URLs)."""
+        return math.ceil(len(text) / cls.CHARS_PER_TOKEN)
+
+    @staticmethod
+    def merge_pages(pages):
+        """Merge pages that share a normalized URL, most time first.
+
+        The normalized URL is only the merge key; each merged page keeps the
+        real URL of its first visit for the prompt.
+        """
+        merged = {}
+        for page in pages:
+            key = normalize_url(page.get("url", ""), drop_timestamps=True)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = dict(page)
+                continue
+            existing["duration_min"] = round(existing.get("duration_min", 0.0) + page.get("duration_min", 0.0), 2)
+            if not existing.get("content") and page.get("content"):
+                existing["content"] = page["content"]
+        return sorted(merged.values(), key=lambda p: p.get("duration_min", 0.0), reverse=True)
+
+    def format_page(self, number, page) -> str:
+        url = page.get("url", "")
+        if len(url) > self.MAX_URL_CHARS:
+            url = url[:self.MAX_URL_CHARS] + "…"
+        line = f"{number}. [{page['duration_min']}min] {page['title']} ({url})"
+        if page.get("content"):
+            line += f"\n  Content: {page['content'][:self.content_chars]}"
+        return line
+
+    def build(self, template: str, goal: str, pages):
+        """Return (prompt, pages included) for a prompt template with {goal} and {pages}.
+
+        The returned pages are numbered in the prompt from 1, in order.
+        """
+        base_tokens = self.estimate_tokens(template.format(goal=goal, pages=""))
+        lines = []
+        kept = []
+        used = base_tokens
+        for page in pages:
+            line = self.format_page(len(kept) + 1, page)
+            cost = self.estimate_tokens(line) + 1
+            # Always keep the top page, even if the budget is tiny
+            if kept and used + cost > self.token_budget:
+                break
+            lines.append(line)
+            kept.append(page)
+            used += cost
+
+        prompt = template.format(goal=goal, pages="\n".join(lines) or "No pages visited")
+        return prompt, kept
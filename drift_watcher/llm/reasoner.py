@@ -1,5 +1,18 @@
 import json
+import time
+
+from ..utils.metrics import METRICS
 from .base import BaseLLMClient
+from .prompt_builder import PromptBuilder
+
+LLM_REQUESTS = METRICS.counter("drift_watcher_llm_requests_total", "LLM calls made", ["provider"])
+LLM_FAILURES = METRICS.counter("drift_watcher_llm_failures_total", "LLM calls that raised", ["provider", "error"])
+LLM_SECONDS = METRICS.histogram("drift_watcher_llm_request_seconds", "LLM call latency", ["provider"])
+LLM_TOKENS = METRICS.counter(
+    "drift_watcher_llm_tokens_total",
+    "Tokens sent and generated, as reported by the provider or estimated (~4 chars/token)",
+    ["provider", "kind"]
+)
 
 
 class LLMReasoner:
@@ -28,29 +41,39 @@ Return JSON only:
   "confidence": 0.0,
   "reason": "brief explanation",
   "relevant_percent": 0.0,
-  "irrelevant_percent": 0.0
+  "irrelevant_percent": 0.0,
+  "relevant_pages": [numbers of the relevant pages]
 }}"""
 
-    def __init__(self, client: BaseLLMClient):
+    def __init__(self, client: BaseLLMClient, cache=None, prompt_builder=None):
         if client is None:
             raise ValueError("LLM client is required")
         self.client = client
+        self.cache = cache
+        self.prompt_builder = prompt_builder or PromptBuilder()
 
     def assess_focus_state(self, goal: str, activity_summary: dict) -> dict:
-        """Single LLM call to assess focus state and relevance breakdown."""
-        pages = activity_summary.get("pages", [])
-        pages_text = "\n".join(
-            f"- [{p['duration_min']}min] {p['title']} ({p['url']})"
-            + (f"\n  Content: {p['content'][:150]}" if p.get("content") else "")
-            for p in pages
-        )
+        """Single LLM call to assess focus state and relevance breakdown.
+
+        When every page that fits the prompt has a cached relevance verdict
+        the state is computed locally and the LLM is not called. Pages left
+        out by the token budget are never scored, so they never reach the
+        cache and are left out of the local verdict too, just as the LLM
+        would not have seen them.
+        """
+        pages = self.prompt_builder.merge_pages(activity_summary.get("pages", []))
 
-        prompt = self.FOCUS_ASSESSMENT_PROMPT.format(
-            goal=goal,
-            pages=pages_text or "No pages visited"
-        )
+        # Lowest-time pages are left out if the prompt would exceed the budget
+        prompt, pages = self.prompt_builder.build(self.FOCUS_ASSESSMENT_PROMPT, goal, pages)
 
-        result = self.client.invoke(prompt, max_tokens=500)
+        if self.cache is not None and pages:
+            cached = [self.cache.get(goal, p) for p in pages]
+            if all(c is not None for c in cached):
+                return self.verdict_from_relevance(
+                    pages, cached, reason="All pages have cached relevance verdicts", source="cache"
+                )
+
+        result = self._invoke(prompt)
 
         # Ensure required fields exist
         result.setdefault("state", "FOCUSED")
@@ -58,5 +81,57 @@ Return JSON only:
         result.setdefault("reason", "")
         result.setdefault("relevant_percent", 0.0)
         result.setdefault("irrelevant_percent", 0.0)
+        result.setdefault("source", "llm")
+
+        self._remember_pages(goal, pages, result.get("relevant_pages"))
+        return result
+
+    def _invoke(self, prompt):
+        """Call the client, recording latency, failures and token counts."""
+        provider = self.client.name
+        LLM_REQUESTS.inc(provider=provider)
+        started = time.perf_counter()
+        try:
+            result = self.client.invoke(prompt, max_tokens=500)
+        except Exception as e:
+            LLM_FAILURES.inc(provider=provider, error=type(e).__name__)
+            raise
+        finally:
+            LLM_SECONDS.observe(time.perf_counter() - started, provider=provider)
 
+        # An early-stopped stream has no provider counts; estimate those
+        usage = getattr(self.client, "last_usage", None) or {}
+        prompt_tokens = usage.get("prompt_tokens") or PromptBuilder.estimate_tokens(prompt)
+        completion_tokens = usage.get("completion_tokens") or PromptBuilder.estimate_tokens(json.dumps(result))
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider=provider, kind="completion")
         return result
+
+    def _remember_pages(self, goal, pages, relevant_pages):
+        """Cache the per-page verdicts the LLM returned, if it returned any."""
+        if self.cache is None or not pages or not isinstance(relevant_pages, list):
+            return
+        try:
+            relevant = {int(n) for n in relevant_pages}
+        except (TypeError, ValueError):
+            return
+        for i, page in enumerate(pages, 1):
+            self.cache.put(goal, page, i in relevant)
+        self.cache.save()
+
+    @staticmethod
+    def verdict_from_relevance(pages, relevance, reason="", source="local") -> dict:
+        """Time-weighted FOCUSED/DRIFTING verdict from per-page relevance flags."""
+        total = sum(p.get("duration_min", 0.0) for p in pages) or 1.0
+        relevant_time = sum(p.get("duration_min", 0.0) for p, r in zip(pages, relevance) if r)
+        relevant_percent = round(100 * relevant_time / total, 1)
+        irrelevant_percent = round(100 - relevant_percent, 1)
+
+        return {
+            "state": "FOCUSED" if relevant_percent >= 50 else "DRIFTING",
+            "confidence": round(max(relevant_percent, irrelevant_percent) / 100, 2),
+            "reason": reason,
+            "relevant_percent": relevant_percent,
+            "irrelevant_percent": irrelevant_percent,
+            "source": source,
+        }
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from ..utils.urls import normalize_url
+
+
+class RelevanceCache:
+    """Per-page relevance verdicts keyed by (goal, normalized URL, title hash).
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones are
+    evicted beyond ``max_entries``. The cache is persisted as JSON so verdicts
+    survive restarts; ``StateManager.reset_logs_on_goal_change`` deletes the
+    file when the goal changes.
+    """
+
+    def __init__(self, path="relevance_cache.json", ttl_seconds=86400, max_entries=5000):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._dirty = False
+        self._load()
+
+    @staticmethod
+    def key(goal: str, page: dict) -> str:
+        goal_hash = hashlib.sha1(goal.strip().lower().encode()).hexdigest()[:12]
+        title_hash = hashlib.sha1((page.get("title") or "").encode()).hexdigest()[:12]
+        return f"{goal_hash}|{normalize_url(page.get('url', ''), drop_timestamps=True)}|{title_hash}"
+
+    def get(self, goal: str, page: dict):
+        """Return the cached relevance (True/False) of a page, or None."""
+        key = self.key(goal, page)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["ts"] > self.ttl_seconds:
+            del self._entries[key]
+            self._dirty = True
+            return None
+        self._entries.move_to_end(key)
+        return entry["relevant"]
+
+    def put(self, goal: str, page: dict, relevant: bool):
+        key = self.key(goal, page)
+        self._entries[key] = {"relevant": bool(relevant), "ts": time.time()}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def clear(self):
+        self._entries.clear()
+        self._dirty = False
+        if self.path.exists():
+            self.path.unlink()
+
+    def save(self):
+        """Write the cache atomically if it changed."""
+        if not self._dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(json.dumps(list(self._entries.items())))
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+    def _load(self):
+        try:
+            items = json.loads(self.path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        now = time.time()
+        for key, entry in items:
+            if now - entry.get("ts", 0) <= self.ttl_seconds:
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,68 @@
+import json
+
+
+class IncrementalJSONParser:
+    """Finds the first complete JSON object in text that arrives in chunks.
+
+    Characters are scanned once as they arrive, tracking brace depth and
+    string/escape state, so the object is recognised the moment its closing
+    brace streams in. Objects that do not parse or lack ``required_keys``
+    (e.g. an example in a model's reasoning) are skipped.
+    """
+
+    def __init__(self, required_keys=("state", "confidence")):
+        self.required_keys = tuple(required_keys)
+        self.result = None
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str):
+        """Consume a chunk; return the object once it is complete, else None."""
+        if self.result is not None:
+            return self.result
+        self.text += chunk
+        text = self.text
+
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            i += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"' and self._depth > 0:
+                # Quotes in prose outside an object are ignored
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._start = i - 1
+                self._depth += 1
+            elif ch == "}" and self._depth > 0:
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._accept(text[self._start:i]):
+                        self._pos = i
+                        return self.result
+                    # Not a verdict (e.g. "{braces} in prose"): rescan from
+                    # just after its opening brace
+                    i = self._start + 1
+        self._pos = i
+        return None
+
+    def _accept(self, candidate) -> bool:
+        try:
+            obj = json.loads(candidate)
+        except json.JSONDecodeError:
+            return False
+        if isinstance(obj, dict) and all(k in obj for k in self.required_keys):
+            self.result = obj
+            return True
+        return False
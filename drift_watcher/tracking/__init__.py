@@ -1,4 +1,26 @@
-from .event_reader import EventReader
-from .activity_processor import ActivityProcessor
+from .event_reader import EventReader, SegmentedEventReader, SQLiteEventReader, build_event_reader
+from .segmented_log import SegmentedEventLog
+from .sqlite_store import SQLiteEventStore
+from .activity_processor import ActivityProcessor, SlidingWindowAggregator
+from .activity_watcher import LogActivityWatcher, ServerActivityWatcher
+from .compactor import BackgroundCompactor
+from .recent_buffer import RecentEventsBuffer
+from .rollups import RollupStore
+from .server_reader import ServerEventReader
 
-__all__ = ["EventReader", "ActivityProcessor"]
+__all__ = [
+    "EventReader",
+    "SegmentedEventReader",
+    "SegmentedEventLog",
+    "SQLiteEventReader",
+    "SQLiteEventStore",
+    "build_event_reader",
+    "ActivityProcessor",
+    "SlidingWindowAggregator",
+    "BackgroundCompactor",
+    "LogActivityWatcher",
+    "ServerActivityWatcher",
+    "RecentEventsBuffer",
+    "RollupStore",
+    "ServerEventReader",
+]
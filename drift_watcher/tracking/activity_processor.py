@@ -1,4 +1,6 @@
-from collections import defaultdict
+import time
+from bisect import bisect_left, insort
+from collections import deque
 
 
 class ActivityProcessor:
@@ -40,3 +42,135 @@ class ActivityProcessor:
             "total_minutes": total_minutes,
             "pages": pages,
         }
+
+
+class SlidingWindowAggregator:
+    """Activity summary maintained incrementally over a sliding window.
+
+    Events are added as they arrive and expired as they leave the window.
+    Per-URL totals are kept in hundredths of a minute and pages are held in
+    a ranking sorted by time spent, so ``aggregate()`` reads the top pages in
+    O(K). The summary has exactly the shape (and rounding) of
+    ``ActivityProcessor.aggregate``.
+    """
+
+    def __init__(self, window_seconds=30, top_k=10):
+        self.window_seconds = window_seconds
+        self.top_k = top_k
+        self._events = deque()   # (server_ts, url or None, units)
+        self._pages = {}         # url -> {"entries": deque of (seq, units, title, content), "units": int}
+        self._ranking = []       # sorted (-units, first_seq, url)
+        self._seq = 0
+        self._last_ts = None
+        self._seen_at_last_ts = 0
+
+    @staticmethod
+    def _units(event):
+        """Duration of one event in hundredths of a minute, as ActivityProcessor rounds it."""
+        duration_min = round(event.get("durationMs", 5000) / 60000, 2)
+        return round(max(duration_min, 0.08) * 100)
+
+    def _rank_key(self, url):
+        page = self._pages[url]
+        return (-page["units"], page["entries"][0][0], url)
+
+    def _unrank(self, url):
+        key = self._rank_key(url)
+        index = bisect_left(self._ranking, key)
+        del self._ranking[index]
+
+    def add(self, event):
+        """Add one event to the window."""
+        ts = event.get("server_ts", 0)
+        if ts == self._last_ts:
+            self._seen_at_last_ts += 1
+        else:
+            self._last_ts = ts
+            self._seen_at_last_ts = 1
+
+        url = event.get("url")
+        title = event.get("title")
+        if not url or not title:
+            self._events.append((ts, None, 0))
+            return
+
+        units = self._units(event)
+        content = event.get("content", "")
+        self._seq += 1
+        page = self._pages.get(url)
+        if page is None:
+            page = {"entries": deque(), "units": 0}
+            self._pages[url] = page
+        else:
+            self._unrank(url)
+
+        # Every entry keeps its title/content: whichever is oldest in the
+        # window is the one the summary shows
+        page["entries"].append((self._seq, units, title, content[:300] if content else ""))
+        page["units"] += units
+        insort(self._ranking, self._rank_key(url))
+        self._events.append((ts, url, units))
+
+    def expire(self, cutoff_ts=None):
+        """Drop events stamped before cutoff_ts (default: the window before now)."""
+        if cutoff_ts is None:
+            cutoff_ts = int(time.time() * 1000) - self.window_seconds * 1000
+
+        while self._events and self._events[0][0] < cutoff_ts:
+            _, url, units = self._events.popleft()
+            if url is None:
+                continue
+            self._unrank(url)
+            page = self._pages[url]
+            page["entries"].popleft()
+            page["units"] -= units
+            if not page["entries"]:
+                del self._pages[url]
+                continue
+            insort(self._ranking, self._rank_key(url))
+
+    def sync(self, events):
+        """Add the events of a window that haven't been added yet.
+
+        ``events`` is a window as returned by ``read_recent``: ordered by
+        server_ts and ending with the newest event.
+        """
+        last_ts, skip_at_last = self._last_ts, self._seen_at_last_ts
+        for event in events:
+            ts = event.get("server_ts", 0)
+            if last_ts is not None and ts < last_ts:
+                continue
+            if ts == last_ts and skip_at_last > 0:
+                skip_at_last -= 1
+                continue
+            self.add(event)
+
+    def aggregate(self, events=None) -> dict:
+        """Return the activity summary, optionally syncing to a window first.
+
+        With ``events`` the aggregator matches that window exactly: new events
+        are added and everything older than its first event is expired.
+        """
+        if events is not None:
+            self.sync(events)
+            if events:
+                self.expire(events[0].get("server_ts", 0))
+            else:
+                self.expire(float("inf"))
+
+        pages = []
+        for _, _, url in self._ranking[:self.top_k]:
+            page = self._pages[url]
+            _, _, title, content = page["entries"][0]
+            pages.append({
+                "title": title,
+                "url": url,
+                "content": content,
+                "duration_min": page["units"] / 100,
+            })
+        total_minutes = round(sum(p["duration_min"] for p in pages), 2) or 1.0
+
+        return {
+            "total_minutes": total_minutes,
+            "pages": pages,
+        }
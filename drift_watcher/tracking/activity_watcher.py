@@ -0,0 +1,182 @@
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+try:
+    from watchdog.observers import Observer
+except ImportError:  # optional: pip install "drift-watcher[watch]"
+    Observer = None
+
+from .segmented_log import SegmentedEventLog
+from .sqlite_store import SQLiteEventStore
+
+
+class _ChangeHandler:
+    """watchdog handler flagging changes to files whose name starts with ``prefix``."""
+
+    def __init__(self, prefix, changed):
+        self.prefix = prefix
+        self.changed = changed
+
+    def dispatch(self, event):
+        if os.path.basename(event.src_path).startswith(self.prefix):
+            self.changed.set()
+
+
+class LogActivityWatcher:
+    """Notices new events by stat()ing the event log, without reading it.
+
+    A background thread compares the log's inode and size and calls
+    ``on_activity`` when it grew. With watchdog installed it re-checks when
+    the file system reports a change (inotify, FSEvents, ...), otherwise
+    every ``poll_interval`` seconds. With the segmented backend the current
+    hour's segment is watched; with SQLite the store's last event id stands
+    in for the size, read on one connection only after ``PRAGMA
+    data_version`` shows another connection committed.
+    """
+
+    # With notifications, a re-check in case one was missed
+    NOTIFIED_POLL_SECONDS = 5.0
+
+    def __init__(self, path, backend="file", poll_interval=0.5):
+        self.path = path
+        self.segment_log = SegmentedEventLog(path) if backend == "segmented" else None
+        self.store = SQLiteEventStore(path) if backend == "sqlite" else None
+        self.poll_interval = poll_interval
+        self._stopped = threading.Event()
+        self._changed = threading.Event()
+        self._observer = None
+        self._thread = None
+        self._db = None
+        self._data_version = None
+        self._last_id = 0
+
+    def start(self, on_activity):
+        if Observer is not None:
+            self._observer = self._observe()
+        self._thread = threading.Thread(
+            target=self._run, args=(on_activity,), name="activity-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        self._changed.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def _observe(self):
+        """Watch the log's directory for changes; None to fall back to polling."""
+        if self.segment_log is not None:
+            directory, prefix = Path(self.path), ""
+        else:
+            # SQLite commits touch the -wal file next to the store
+            directory, prefix = Path(self.path).parent, Path(self.path).name
+        observer = Observer()
+        try:
+            observer.schedule(_ChangeHandler(prefix, self._changed), str(directory), recursive=False)
+            observer.start()
+        except OSError:
+            # e.g. out of inotify watches
+            return None
+        return observer
+
+    def _wait(self) -> bool:
+        """Sleep until the log may have changed; False once stopped."""
+        if self._observer is None:
+            return not self._stopped.wait(self.poll_interval)
+        self._changed.wait(self.NOTIFIED_POLL_SECONDS)
+        self._changed.clear()
+        return not self._stopped.is_set()
+
+    def _current_path(self):
+        if self.segment_log is None:
+            return self.path
+        return self.segment_log.segment_path(time.time() * 1000)
+
+    def _signature(self):
+        if self.store is not None:
+            return (self.path, None, self._store_last_id())
+        path = self._current_path()
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return (path, None, 0)
+        return (path, st.st_ino, st.st_size)
+
+    def _store_last_id(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=5)
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            row = self._db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+            self._last_id = row[0] if row else 0
+        return self._last_id
+
+    def _run(self, on_activity):
+        try:
+            last = self._signature()
+            while self._wait():
+                current = self._signature()
+                if current == last:
+                    continue
+                path, inode, size = current
+                # Grew in place, or a new file/segment with events in it;
+                # a shrink is compaction, not activity
+                if size > 0 and (inode != last[1] or path != last[0] or size > last[2]):
+                    on_activity()
+                last = current
+        finally:
+            if self._db is not None:
+                self._db.close()
+
+
+class ServerActivityWatcher:
+    """Notices new events by long-polling the event server's /api/events/wait.
+
+    With ``profile`` it waits on that profile's events.
+    """
+
+    RETRY_SECONDS = 5
+
+    def __init__(self, base_url, wait_seconds=25, profile=None):
+        self.base_url = base_url.rstrip("/")
+        self.params = {"profile": profile} if profile else {}
+        self.wait_seconds = wait_seconds
+        self.session = requests.Session()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self, on_activity):
+        self._thread = threading.Thread(
+            target=self._run, args=(on_activity,), name="activity-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def _run(self, on_activity):
+        after_ts = int(time.time() * 1000)
+        while not self._stopped.is_set():
+            try:
+                response = self.session.get(
+                    f"{self.base_url}/api/events/wait",
+                    params={"after": after_ts, "timeout": self.wait_seconds, **self.params},
+                    timeout=self.wait_seconds + 5
+                )
+                response.raise_for_status()
+                payload = response.json()
+            except (requests.RequestException, ValueError):
+                # Server down: no events are being recorded either
+                self._stopped.wait(self.RETRY_SECONDS)
+                continue
+
+            if payload.get("new"):
+                after_ts = payload["newest_ts"]
+                on_activity()
@@ -0,0 +1,375 @@
+"""Dashboard API payloads shared by the Flask and async event servers."""
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+
+from ..utils.metrics import METRICS
+
+
+DASHBOARD_DIR = Path(__file__).parent.parent / "dashboard"
+DASHBOARD_FILES = ("index.html", "dashboard.js", "dashboard.css")
+INGEST_SECONDS = METRICS.histogram(
+    "drift_watcher_server_ingest_seconds", "Time to accept and commit an ingest request", ["route"]
+)
+INGESTED_EVENTS = METRICS.counter("drift_watcher_server_events_total", "Events accepted by the server")
+INGEST_ERRORS = METRICS.counter("drift_watcher_server_ingest_errors_total", "Rejected ingest requests", ["route"])
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_PAGE_SIZE = 500
+
+
+def stats_payload(state_manager=None) -> dict:
+    """Build the /api/stats response from the agent's saved state."""
+    if state_manager is None:
+        from ..core.state_manager import StateManager
+        state_manager = StateManager()
+    
+    state = state_manager.load()
+    
+    # Calculate session time
+    session_minutes = 0
+    if state.get("session_start_ts") and state.get("session_start_ts") > 0:
+        session_minutes = max(0, int((time.time() - state["session_start_ts"]) / 60))
+    
+    # Format last check time
+    last_check = "Never"
+    if state.get("last_check_ts") and state.get("last_check_ts") > 0:
+        seconds_ago = max(0, int(time.time() - state["last_check_ts"]))
+        if seconds_ago < 60:
+            last_check = f"{seconds_ago}s"
+        elif seconds_ago < 3600:
+            last_check = f"{seconds_ago // 60}m"
+        else:
+            last_check = f"{seconds_ago // 3600}h"
+    
+    return {
+        "goal": state.get("goal", "No goal set"),
+        "focus_state": state.get("focus_state", "UNKNOWN"),
+        "confidence": state.get("confidence", 0.0),
+        "drift_count": state.get("drift_count", 0),
+        "session_minutes": session_minutes,
+        "last_check": last_check,
+        "last_check_ts": state.get("last_check_ts", 0),
+        "session_start_ts": state.get("session_start_ts", 0),
+        "relevant_percent": state.get("relevant_percent", 0.0),
+        "irrelevant_percent": state.get("irrelevant_percent", 0.0),
+        "assessment_sources": state.get("assessment_sources", {}),
+        "fingerprint": state.get("fingerprint", {}),
+    }
+
+
+def history_payload(state_manager=None, limit=HISTORY_PAGE_SIZE, before=None, before_id=None) -> dict:
+    """Build one /api/history page, newest session first.
+
+    ``next_before`` is the cursor for the following page, ``"<end_ts>:<id>"``
+    of its last session, or None on the last page.
+    """
+    if state_manager is None:
+        from ..core.state_manager import StateManager
+        state_manager = StateManager()
+    
+    # One extra row tells us whether another page follows
+    sessions = state_manager.query_history(limit=limit + 1, before_ts=before, before_id=before_id)
+    next_before = None
+    if len(sessions) > limit:
+        last = sessions[limit - 1]
+        next_before = f"{last['end_ts']!r}:{last['id']}"
+    return {"sessions": sessions[:limit], "next_before": next_before}
+
+
+def _summary_row(counts) -> dict:
+    return {
+        "sessions": counts["sessions"],
+        "minutes": round(counts["seconds"] / 60, 1),
+        "drift_count": counts["drift_count"],
+        "focus_ratio": round(counts["focused_checks"] / counts["checks"], 3) if counts["checks"] else None,
+    }
+
+
+def summary_payload(state_manager=None, days=30, weeks=12) -> dict:
+    """Build the /api/history/summary response from the maintained summary index."""
+    if state_manager is None:
+        from ..core.state_manager import StateManager
+        state_manager = StateManager()
+    
+    summary = state_manager.history_summary(days=days, weeks=weeks)
+    return {
+        "totals": _summary_row(summary["total"]),
+        "days": [dict(_summary_row(counts), date=key) for key, counts in summary["day"]],
+        "weeks": [dict(_summary_row(counts), week=key) for key, counts in summary["week"]],
+    }
+
+
+def query_params(name, args) -> dict:
+    """Parse the query parameters of a dashboard payload; raises ValueError."""
+    params = {}
+    if name == "history":
+        if "limit" in args:
+            params["limit"] = int(args["limit"])
+            if not 1 <= params["limit"] <= HISTORY_MAX_PAGE_SIZE:
+                raise ValueError(f"limit must be between 1 and {HISTORY_MAX_PAGE_SIZE}")
+        if "before" in args:
+            # "<end_ts>:<id>" from next_before, or a bare end_ts
+            end_ts, _, session_id = args["before"].partition(":")
+            params["before"] = float(end_ts)
+            if session_id:
+                params["before_id"] = int(session_id)
+    elif name == "summary":
+        for key in ("days", "weeks"):
+            if key in args:
+                params[key] = int(args[key])
+                if params[key] < 0:
+                    raise ValueError(f"{key} must not be negative")
+    return params
+
+
+def timeseries_payload(rollups, args) -> dict:
+    """Build the /api/timeseries response from rollups; raises ValueError on bad args.
+
+    Query parameters: ``series`` (domain or verdict), ``resolution``
+    (minute, hour or day), ``start``/``end`` in epoch seconds, ``keys``
+    (comma-separated) and ``top``.
+    """
+    keys = [k for k in args.get("keys", "").split(",") if k]
+    return rollups.query(
+        series=args.get("series", "domain"),
+        resolution=args.get("resolution", "hour"),
+        start=float(args["start"]) if "start" in args else None,
+        end=float(args["end"]) if "end" in args else None,
+        keys=keys or None,
+        top=int(args["top"]) if "top" in args else None,
+    )
+
+
+def metrics_text(agent_metrics_file=None) -> str:
+    """The server's metrics followed by the ones the agent last published."""
+    text = METRICS.render()
+    if agent_metrics_file:
+        try:
+            text += Path(agent_metrics_file).read_text()
+        except FileNotFoundError:
+            pass
+    return text
+
+
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def sse_message(event, payload) -> str:
+    """Format one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+class DashboardState:
+    """Cached dashboard payloads, rebuilt only when the agent writes.
+
+    Each payload is stored with the state manager's version token (file
+    mtime/size for JSON, a row stamp for SQLite) and a weak ETag derived
+    from it, so repeated requests cost one version probe and unchanged
+    ones can be answered 304. A single poller thread probes the versions
+    every ``POLL_SECONDS`` while SSE clients are waiting on ``changes`` or
+    subscribed with ``subscribe``.
+
+    Relative fields (``last_check``, ``session_minutes``) are as of when
+    the payload was built; clients should use the ``*_ts`` fields.
+    """
+
+    POLL_SECONDS = 0.5
+    PAYLOADS = {
+        "stats": (stats_payload, "state_version"),
+        "history": (history_payload, "history_version"),
+        "summary": (summary_payload, "history_version"),
+    }
+
+    def __init__(self, state_manager=None):
+        if state_manager is None:
+            from ..core.state_manager import StateManager
+            state_manager = StateManager()
+        self.state_manager = state_manager
+        self._entries = {}       # name -> (version, payload, etag)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+        self._versions = {}
+        self._waiters = 0
+        self._listeners = []
+        self._poller = None
+
+    def get(self, name, **params):
+        """Return (payload, etag) for "stats", "history" or "summary".
+
+        Only the default (parameterless) payloads are cached; other pages
+        are built per request but still get an ETag.
+        """
+        build, version_of = self.PAYLOADS[name]
+        version = getattr(self.state_manager, version_of)()
+        if params:
+            return build(self.state_manager, **params), self._etag(name, version, params)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == version and version is not None:
+                return entry[1], entry[2]
+        payload = build(self.state_manager)
+        etag = self._etag(name, version)
+        with self._lock:
+            self._entries[name] = (version, payload, etag)
+        return payload, etag
+
+    @staticmethod
+    def _etag(name, version, params=None):
+        key = f"{name}:{version}:{sorted(params.items())}" if params else f"{name}:{version}"
+        return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+    @staticmethod
+    def not_modified(if_none_match, etag) -> bool:
+        """True if an If-None-Match header value matches etag."""
+        if not if_none_match:
+            return False
+        tags = [t.strip() for t in if_none_match.split(",")]
+        return "*" in tags or etag in tags or etag[2:] in tags
+
+    def changes(self, known, timeout):
+        """Block until a payload's ETag differs from ``known`` (name -> etag).
+
+        Returns {name: (payload, etag)} for what changed, or {} on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            self._waiters += 1
+            self._start_poller()
+        try:
+            while True:
+                changed = self.changed_since(known)
+                remaining = deadline - time.monotonic()
+                if changed or remaining <= 0:
+                    return changed
+                with self._changed:
+                    self._changed.wait(remaining)
+        finally:
+            with self._changed:
+                self._waiters -= 1
+
+    def changed_since(self, known):
+        """{name: (payload, etag)} for each payload whose ETag differs from ``known``."""
+        changed = {}
+        for name in self.PAYLOADS:
+            payload, etag = self.get(name)
+            if known.get(name) != etag:
+                changed[name] = (payload, etag)
+        return changed
+
+    def subscribe(self, callback):
+        """Call ``callback()`` on the poller thread whenever the agent writes.
+
+        For clients that must not block a thread, e.g. an event loop passing
+        ``loop.call_soon_threadsafe``; the callback should only hand off.
+        Pair with ``unsubscribe``.
+        """
+        with self._changed:
+            self._listeners.append(callback)
+            self._start_poller()
+
+    def unsubscribe(self, callback):
+        with self._changed:
+            self._listeners.remove(callback)
+
+    def _start_poller(self):
+        if self._poller is None or not self._poller.is_alive():
+            self._poller = threading.Thread(target=self._poll, name="dashboard-poller", daemon=True)
+            self._poller.start()
+
+    def _poll(self):
+        while True:
+            with self._changed:
+                if self._waiters == 0 and not self._listeners:
+                    # Nobody is streaming; the next waiter restarts us
+                    self._poller = None
+                    return
+            versions = {
+                name: getattr(self.state_manager, version_of)()
+                for name, (_, version_of) in self.PAYLOADS.items()
+            }
+            if versions != self._versions:
+                self._versions = versions
+                with self._changed:
+                    self._changed.notify_all()
+                    listeners = list(self._listeners)
+                for callback in listeners:
+                    callback()
+            time.sleep(self.POLL_SECONDS)
+
+
+class EventChannel:
+    """An event log with its recent-events buffer and domain rollups."""
+
+    def __init__(self, writer, recent, rollups=None):
+        self.writer = writer
+        self.recent = recent
+        self.rollups = rollups
+
+    def add(self, events):
+        """Record events the writer has committed."""
+        self.recent.extend(events)
+        if self.rollups is not None:
+            self.rollups.add_events(events)
+        INGESTED_EVENTS.inc(len(events))
+
+
+class ProfileViews:
+    """Dashboard state, verdict rollups and event channel of each agent profile.
+
+    Each profile writes its own state, history and verdict rollups, so the
+    dashboard routes and ``/api/timeseries?series=verdict`` pick one with
+    ``?profile=<name>``, defaulting to the first. The ingest and
+    ``/api/events`` routes take ``?profile=`` too: a profile with an
+    ``events_path`` of its own gets its own log, buffer and domain rollups
+    (kept in its rollup store); the others share the server's.
+    """
+
+    def __init__(self, profiles, channel, open_channel=None):
+        # profiles: {name: (state_manager, verdict rollups or None, (events_file, backend) or None)},
+        # in config order; None events share ``channel``, others are opened with ``open_channel``
+        self.dashboards = {name: DashboardState(sm) for name, (sm, _, _) in profiles.items()}
+        self.rollups = {name: rollups for name, (_, rollups, _) in profiles.items()}
+        self.channels = {}
+        opened = {}
+        for name, (_, rollups, events) in profiles.items():
+            if events is None:
+                self.channels[name] = channel
+            else:
+                if events not in opened:
+                    opened[events] = open_channel(*events, rollups)
+                self.channels[name] = opened[events]
+        self.default = next(iter(profiles))
+        # Requests without ?profile= ingest into the server's own log
+        self.default_channel = channel
+
+    def name(self, args) -> str:
+        """The profile a request asks for; raises LookupError for unknown names."""
+        name = args.get("profile") or self.default
+        if name not in self.dashboards:
+            raise LookupError(f"Unknown profile '{name}'. Available: {list(self.dashboards)}")
+        return name
+
+    def dashboard(self, args) -> DashboardState:
+        return self.dashboards[self.name(args)]
+
+    def channel(self, args) -> EventChannel:
+        """The event channel a request ingests into or reads from; raises LookupError."""
+        if not args.get("profile"):
+            return self.default_channel
+        return self.channels[self.name(args)]
+
+    def all_channels(self):
+        """Every distinct channel, the server's own first."""
+        channels = [self.default_channel]
+        for channel in self.channels.values():
+            if channel not in channels:
+                channels.append(channel)
+        return channels
+
+    def timeseries_store(self, args):
+        """The rollup store that answers a /api/timeseries request, or None if disabled."""
+        if args.get("series") == "verdict":
+            return self.rollups[self.name(args)]
+        return self.channel(args).rollups
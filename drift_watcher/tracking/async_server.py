@@ -0,0 +1,313 @@
+import asyncio
+import functools
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from aiohttp import web
+except ImportError:  # optional: pip install "drift-watcher[async]"
+    web = None
+
+from ..utils.metrics import CONTENT_TYPE
+from .api import (
+    DASHBOARD_DIR, DASHBOARD_FILES, INGEST_ERRORS, INGEST_SECONDS, SSE_KEEPALIVE_SECONDS,
+    DashboardState, EventChannel, ProfileViews, metrics_text, query_params, sse_message, timeseries_payload
+)
+from .event_writer import build_event_writer
+from .recent_buffer import RecentEventsBuffer
+from .server import parse_event_batch, stamp_events
+
+
+class AsyncEventServer:
+    """asyncio (aiohttp) server for receiving browser events.
+
+    Serves the same routes as ``EventServer``. Request handlers only enqueue
+    events; a single writer task drains the queue and hands whole batches to
+    the ``EventWriter`` on a dedicated thread, so disk I/O never blocks the
+    event loop and bursts of requests share one write and one fsync.
+    """
+
+    MAX_QUEUED_BATCHES = 10000
+
+    def __init__(self, events_file="events.log", host="127.0.0.1", port=3333, events_backend="file",
+                 durability="always", fsync_interval_ms=100, buffer_max_events=10000,
+                 buffer_max_age_seconds=3600, state_manager=None, rollups=None, metrics_file=None,
+                 profiles=None):
+        if web is None:
+            raise ImportError("Async server mode needs aiohttp: pip install 'drift-watcher[async]'")
+        self.events_backend = events_backend
+        self.rollups = rollups
+        self.metrics_file = metrics_file
+        self.writer = build_event_writer(events_file, events_backend, durability, fsync_interval_ms)
+        self.recent = RecentEventsBuffer(buffer_max_events, buffer_max_age_seconds)
+
+        def open_channel(path, backend, channel_rollups):
+            return EventChannel(
+                build_event_writer(path, backend, durability, fsync_interval_ms),
+                RecentEventsBuffer(buffer_max_events, buffer_max_age_seconds),
+                channel_rollups
+            )
+
+        # Without a profiles list the server's own state and rollups are the only profile
+        self.profiles = ProfileViews(
+            profiles or {"default": (state_manager, rollups, None)},
+            EventChannel(self.writer, self.recent, rollups),
+            open_channel
+        )
+        self.host = host
+        self.port = port
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-writer")
+        self._queue = None
+        self._arrived = None
+        self.app = web.Application()
+        self.app.on_startup.append(self._start_writer)
+        self.app.on_cleanup.append(self._stop_writer)
+        self._setup_routes()
+
+    def _setup_routes(self):
+        """Setup aiohttp routes."""
+        routes = [
+            web.post("/event", self.receive_event),
+            web.post("/events", self.receive_events),
+            web.get("/api/events", self.get_events),
+            web.get("/api/events/wait", self.wait_events),
+            web.get("/health", self.health),
+            web.get("/metrics", self.metrics),
+            web.get("/api/stats", self.get_stats),
+            web.get("/api/history", self.get_history),
+            web.get("/api/history/summary", self.get_history_summary),
+            web.get("/api/timeseries", self.get_timeseries),
+            web.get("/api/stream", self.stream),
+        ]
+        for name, route in zip(DASHBOARD_FILES, ("/dashboard", "/dashboard.js", "/dashboard.css")):
+            routes.append(web.get(route, self._static(name)))
+        self.app.add_routes(routes)
+
+    async def _start_writer(self, app):
+        self._queue = asyncio.Queue(maxsize=self.MAX_QUEUED_BATCHES)
+        self._arrived = {channel: asyncio.Event() for channel in self.profiles.all_channels()}
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        for channel in self._arrived:
+            if channel.rollups is not None:
+                channel.rollups.start()
+
+    async def _stop_writer(self, app):
+        self._writer_task.cancel()
+        try:
+            await self._writer_task
+        except asyncio.CancelledError:
+            pass
+        loop = asyncio.get_running_loop()
+        for channel in self._arrived:
+            await loop.run_in_executor(self._io, channel.writer.close)
+            if channel.rollups is not None:
+                await loop.run_in_executor(self._io, channel.rollups.close)
+        self._io.shutdown(wait=True)
+
+    async def _writer_loop(self):
+        """Drain queued batches and commit them together off the event loop.
+
+        Batches for the same channel share one write.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            pending = [await self._queue.get()]
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            by_channel = {}
+            for channel, batch, done in pending:
+                events, waiters = by_channel.setdefault(channel, ([], []))
+                events.extend(batch)
+                waiters.append(done)
+            for channel, (events, waiters) in by_channel.items():
+                try:
+                    await loop.run_in_executor(self._io, channel.writer.write, events)
+                    error = None
+                except Exception as e:
+                    error = e
+                for done in waiters:
+                    if done.done():
+                        continue
+                    if error is None:
+                        done.set_result(None)
+                    else:
+                        done.set_exception(error)
+
+    async def _commit(self, channel, events):
+        """Queue events for the writer task and wait until they are committed."""
+        done = asyncio.get_running_loop().create_future()
+        await self._queue.put((channel, stamp_events(events), done))
+        await done
+        channel.add(events)
+        # Wake long-polls waiting on the loop; later waiters get a fresh event
+        arrived, self._arrived[channel] = self._arrived[channel], asyncio.Event()
+        arrived.set()
+
+    async def receive_event(self, request):
+        with INGEST_SECONDS.time(route="event"):
+            try:
+                channel = self.profiles.channel(request.query)
+            except LookupError as e:
+                INGEST_ERRORS.inc(route="event")
+                return web.json_response({"error": str(e)}, status=404)
+            try:
+                event = json.loads(await request.read())
+                await self._commit(channel, [event])
+                return web.json_response({"status": "ok"}, status=200)
+            except Exception as e:
+                INGEST_ERRORS.inc(route="event")
+                return web.json_response({"error": str(e)}, status=400)
+
+    async def receive_events(self, request):
+        """Receive a batch of events, committed with a single write."""
+        with INGEST_SECONDS.time(route="events"):
+            try:
+                channel = self.profiles.channel(request.query)
+            except LookupError as e:
+                INGEST_ERRORS.inc(route="events")
+                return web.json_response({"error": str(e)}, status=404)
+            try:
+                # aiohttp already undoes Content-Encoding: gzip on request bodies
+                events = parse_event_batch(await request.read())
+                await self._commit(channel, events)
+                return web.json_response({"status": "ok", "accepted": len(events)}, status=200)
+            except Exception as e:
+                INGEST_ERRORS.inc(route="events")
+                return web.json_response({"error": str(e)}, status=400)
+
+    async def metrics(self, request):
+        """Prometheus text exposition: server metrics plus the agent's last published ones."""
+        text = await asyncio.get_running_loop().run_in_executor(None, metrics_text, self.metrics_file)
+        return web.Response(body=text.encode(), headers={"Content-Type": CONTENT_TYPE})
+
+    async def get_events(self, request):
+        """Recent events from the in-memory buffer (?since=<server_ts ms>&profile=)."""
+        try:
+            since_ts = int(request.query.get("since", 0))
+        except ValueError:
+            return web.json_response({"error": "since must be a timestamp in ms"}, status=400)
+        try:
+            channel = self.profiles.channel(request.query)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        return web.json_response(channel.recent.since(since_ts), status=200)
+
+    async def wait_events(self, request):
+        """Long-poll until events newer than ?after=<server_ts ms> arrive (?timeout=<s>&profile=)."""
+        try:
+            after_ts = int(request.query.get("after", 0))
+            timeout = float(request.query.get("timeout", 25))
+        except ValueError:
+            return web.json_response({"error": "after must be a timestamp in ms, timeout in seconds"}, status=400)
+        try:
+            channel = self.profiles.channel(request.query)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        # Waits on the loop itself, so idle long-polls hold no executor thread
+        loop = asyncio.get_running_loop()
+        recent = channel.recent
+        deadline = loop.time() + min(max(timeout, 0), recent.MAX_WAIT_SECONDS)
+        while recent.newest_ts <= after_ts:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                await asyncio.wait_for(self._arrived[channel].wait(), remaining)
+            except asyncio.TimeoutError:
+                break
+        newest_ts = recent.newest_ts
+        return web.json_response({"newest_ts": newest_ts, "new": newest_ts > after_ts}, status=200)
+
+    async def health(self, request):
+        return web.json_response({"status": "running"}, status=200)
+
+    async def get_stats(self, request):
+        """Get current stats for dashboard."""
+        return await self._cached(request, "stats")
+
+    async def get_history(self, request):
+        """Get a page of session history (?limit=&before=<next_before>)."""
+        return await self._cached(request, "history")
+
+    async def get_history_summary(self, request):
+        """Get per-day/week history totals (?days=&weeks=)."""
+        return await self._cached(request, "summary")
+
+    async def get_timeseries(self, request):
+        """Time per domain or verdict from the rollups (?series=&resolution=&start=&end=&keys=&top=&profile=)."""
+        try:
+            rollups = self.profiles.timeseries_store(request.query)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        if rollups is None:
+            return web.json_response({"error": "Rollups are disabled (storage.rollups)"}, status=404)
+        try:
+            payload = await asyncio.get_running_loop().run_in_executor(
+                None, timeseries_payload, rollups, request.query
+            )
+            return web.json_response(payload, status=200)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+    async def _cached(self, request, name):
+        """Serve a dashboard payload from cache, 304 if the client's ETag still matches."""
+        try:
+            params = query_params(name, request.query)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+        try:
+            dashboard = self.profiles.dashboard(request.query)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        # State is probed/read on the default executor, not the writer thread
+        try:
+            payload, etag = await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(dashboard.get, name, **params)
+            )
+        except Exception as e:
+            return web.json_response({"error": str(e)}, status=500)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if DashboardState.not_modified(request.headers.get("If-None-Match"), etag):
+            return web.Response(status=304, headers=headers)
+        return web.json_response(payload, status=200, headers=headers)
+
+    async def stream(self, request):
+        """Server-Sent Events: stats/history/summary pushed when the agent writes new state."""
+        try:
+            dashboard = self.profiles.dashboard(request.query)
+        except LookupError as e:
+            return web.json_response({"error": str(e)}, status=404)
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"})
+        await response.prepare(request)
+        loop = asyncio.get_running_loop()
+        # The dashboard poller wakes us on the loop, so an idle stream holds no thread
+        written = asyncio.Event()
+
+        def notify():
+            loop.call_soon_threadsafe(written.set)
+
+        dashboard.subscribe(notify)
+        try:
+            known = {}
+            while True:
+                written.clear()
+                changed = await loop.run_in_executor(None, dashboard.changed_since, known)
+                for name, (payload, etag) in changed.items():
+                    known[name] = etag
+                    await response.write(sse_message(name, payload).encode())
+                try:
+                    await asyncio.wait_for(written.wait(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    await response.write(b": keepalive\n\n")
+        finally:
+            dashboard.unsubscribe(notify)
+
+    def _static(self, name):
+        async def handler(request):
+            return web.FileResponse(DASHBOARD_DIR / name)
+        return handler
+
+    def run(self):
+        """Start the server."""
+        web.run_app(self.app, host=self.host, port=self.port, print=None)
@@ -0,0 +1,40 @@
+import threading
+
+
+class BackgroundCompactor:
+    """Runs event log cleanup on a daemon thread so the agent never waits on it."""
+
+    def __init__(self, event_reader):
+        self.event_reader = event_reader
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def request(self) -> bool:
+        """Start a cleanup run unless one is already in progress."""
+        with self._lock:
+            if self.running:
+                return False
+            self._thread = threading.Thread(target=self._run, name="log-compactor", daemon=True)
+            self._thread.start()
+            return True
+
+    def _run(self):
+        try:
+            removed = self.event_reader.cleanup_old_logs()
+        except Exception as e:
+            print(f"⚠️ Log cleanup failed: {e}")
+            return
+
+        stats = getattr(self.event_reader, "last_cleanup", None) or {}
+        if removed > 0:
+            unit = getattr(self.event_reader, "cleanup_unit", "old log entries")
+            reclaimed_kb = stats.get("bytes_reclaimed", 0) / 1024
+            print(
+                f"🗑️  Cleaned up {removed} {unit} | "
+                f"Reclaimed: {reclaimed_kb:.1f} KB | "
+                f"Took: {stats.get('duration_s', 0.0):.2f}s"
+            )
@@ -1,58 +1,303 @@
 import json
+import os
+import shutil
+import tempfile
 import time
+from collections import deque
 from pathlib import Path
 
+from .file_lock import log_lock
+from .segmented_log import SegmentedEventLog
+from .sqlite_store import SQLiteEventStore
+
+
+def read_events_since(file_path, cutoff_ts):
+    """Parse a JSONL log and keep events stamped at or after cutoff_ts."""
+    events = []
+
+    try:
+        with open(file_path, "r") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                    if event.get("server_ts", 0) >= cutoff_ts:
+                        events.append(event)
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+
+    return events
+
 
 class EventReader:
-    """Reads and filters events from log file."""
-    
-    def __init__(self, file_path, max_age_days=7):
+    """Reads and filters events from log file.
+
+    In tail mode (the default) the reader remembers the byte offset and inode
+    of the log between calls, parses only lines appended since the previous
+    call and keeps the recent window in memory, so each call costs time
+    proportional to the new events rather than to the size of the log.
+    """
+
+    SEED_BLOCK_BYTES = 64 * 1024
+    cleanup_unit = "old log entries"
+
+    def __init__(self, file_path, max_age_days=7, tail=True):
         self.file_path = file_path
         self.max_age_days = max_age_days
+        self.tail = tail
+        self._offset = 0
+        self._inode = None
+        self._window = deque()
+        self._horizon_seconds = 0
+        self.last_cleanup = None
+        self.bytes_read = 0
     
     def read_recent(self, window_seconds=30):
         """Read events from the last N seconds."""
         cutoff_ts = int(time.time() * 1000) - (window_seconds * 1000)
-        events = []
-        
+
+        if not self.tail:
+            try:
+                self.bytes_read += os.path.getsize(self.file_path)
+            except OSError:
+                pass
+            return read_events_since(self.file_path, cutoff_ts)
+
+        # A wider window than before needs events we already dropped
+        if window_seconds > self._horizon_seconds:
+            self._reset()
+            self._horizon_seconds = window_seconds
+
+        # Keep the widest window asked for; narrower calls only filter it
+        horizon_ts = int(time.time() * 1000) - (self._horizon_seconds * 1000)
+        self._window.extend(self._read_appended(horizon_ts))
+
+        while self._window and self._window[0].get("server_ts", 0) < horizon_ts:
+            self._window.popleft()
+
+        if window_seconds == self._horizon_seconds:
+            return list(self._window)
+        return [e for e in self._window if e.get("server_ts", 0) >= cutoff_ts]
+
+    def _reset(self):
+        """Forget the tail position and the in-memory window."""
+        self._offset = 0
+        self._inode = None
+        self._window.clear()
+
+    def _read_appended(self, cutoff_ts):
+        """Parse complete lines appended since the last call."""
         try:
-            with open(self.file_path, "r") as f:
-                for line in f:
-                    try:
-                        event = json.loads(line)
-                        if event.get("server_ts", 0) >= cutoff_ts:
-                            events.append(event)
-                    except json.JSONDecodeError:
-                        continue
+            f = open(self.file_path, "rb")
         except FileNotFoundError:
-            pass
-        
+            self._reset()
+            return []
+
+        with f:
+            stat = os.fstat(f.fileno())
+
+            if self._inode is not None and not self._same_file(f, stat):
+                # Rotated, replaced or truncated (e.g. by cleanup_old_logs)
+                self._reset()
+
+            if self._inode is None:
+                self._inode = stat.st_ino
+                self._offset = self._seek_window_start(f, stat.st_size, cutoff_ts)
+
+            if stat.st_size <= self._offset:
+                return []
+
+            f.seek(self._offset)
+            data = f.read()
+            self.bytes_read += len(data)
+
+        # Leave a partially written last line for the next call
+        end = data.rfind(b"\n")
+        if end < 0:
+            return []
+        self._offset += end + 1
+
+        events = []
+        for line in data[:end].split(b"\n"):
+            try:
+                event = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(event, dict) and event.get("server_ts", 0) >= cutoff_ts:
+                events.append(event)
         return events
-    
+
+    def _same_file(self, f, stat):
+        """Check that the open file is the one we were tailing."""
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            return False
+        if self._offset == 0:
+            return True
+        # In-place rewrites keep the inode; the byte before our offset must
+        # still be the newline that ended the last line we parsed.
+        f.seek(self._offset - 1)
+        return f.read(1) == b"\n"
+
+    def _seek_window_start(self, f, size, cutoff_ts):
+        """Find a line boundary at or before the first event newer than cutoff_ts.
+
+        Events are appended in server_ts order, so walking backwards block by
+        block until a line older than the cutoff shows up avoids parsing the
+        whole log when the reader starts.
+        """
+        pos = size
+        while pos > 0:
+            pos = max(0, pos - self.SEED_BLOCK_BYTES)
+            f.seek(pos)
+            if pos > 0:
+                f.readline()  # skip the partial line we landed in
+            start = f.tell()
+            line = f.readline()
+            try:
+                ts = json.loads(line).get("server_ts", 0)
+            except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                continue
+            if ts < cutoff_ts:
+                return start
+        return 0
+
     def cleanup_old_logs(self):
-        """Remove log entries older than max_age_days."""
+        """Remove log entries older than max_age_days.
+
+        The log is streamed into a temporary file next to it, never held in
+        memory. Lines the server appends meanwhile are copied over under the
+        log lock right before the temporary file atomically replaces the log,
+        so no event is lost. Stats of the run are kept in ``last_cleanup``.
+        """
         path = Path(self.file_path)
         if not path.exists():
             return 0
-        
+
+        started = time.monotonic()
         cutoff_ts = int(time.time() * 1000) - (self.max_age_days * 24 * 60 * 60 * 1000)
-        kept_events = []
         removed_count = 0
-        
-        with open(self.file_path, "r") as f:
-            for line in f:
-                try:
-                    event = json.loads(line)
-                    if event.get("server_ts", 0) >= cutoff_ts:
-                        kept_events.append(line)
+        size_before = path.stat().st_size
+
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".compact", dir=str(path.parent))
+        try:
+            with open(path, "rb") as src, os.fdopen(fd, "wb") as dst:
+                offset = 0
+                for line in iter(src.readline, b""):
+                    if not line.endswith(b"\n"):
+                        break  # still being written; copied with the tail below
+                    offset += len(line)
+                    try:
+                        event = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        continue
+                    if isinstance(event, dict) and event.get("server_ts", 0) >= cutoff_ts:
+                        dst.write(line)
                     else:
                         removed_count += 1
-                except json.JSONDecodeError:
-                    continue
-        
-        # Rewrite file with only recent events
-        if removed_count > 0:
-            with open(self.file_path, "w") as f:
-                f.writelines(kept_events)
-        
+
+                if removed_count == 0:
+                    os.unlink(tmp_name)
+                    self.last_cleanup = {"removed": 0, "bytes_reclaimed": 0,
+                                         "duration_s": round(time.monotonic() - started, 3)}
+                    return 0
+
+                # Hand-off: copy whatever arrived while we streamed, then swap
+                with log_lock(path):
+                    src.seek(offset)
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                    size_after = dst.tell()
+                    os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+        self.last_cleanup = {
+            "removed": removed_count,
+            "bytes_reclaimed": max(0, size_before - size_after),
+            "duration_s": round(time.monotonic() - started, 3),
+        }
         return removed_count
+
+
+class SegmentedEventReader:
+    """Reads events from an hourly segmented log directory."""
+
+    cleanup_unit = "expired log segments"
+
+    def __init__(self, directory, max_age_days=7):
+        self.file_path = directory
+        self.max_age_days = max_age_days
+        self.log = SegmentedEventLog(directory)
+        self.last_cleanup = None
+        self.bytes_read = 0
+
+    def read_recent(self, window_seconds=30):
+        """Read events from the last N seconds, opening only the segments that cover them."""
+        cutoff_ts = int(time.time() * 1000) - (window_seconds * 1000)
+        events = []
+        for path in self.log.segments_since(cutoff_ts):
+            try:
+                self.bytes_read += os.path.getsize(path)
+            except OSError:
+                pass
+            events.extend(read_events_since(path, cutoff_ts))
+        return events
+
+    def cleanup_old_logs(self):
+        """Delete segments older than max_age_days; returns segments removed."""
+        started = time.monotonic()
+        cutoff_ts = int(time.time() * 1000) - (self.max_age_days * 24 * 60 * 60 * 1000)
+        removed, reclaimed = self.log.drop_older_than(cutoff_ts)
+        self.last_cleanup = {
+            "removed": removed,
+            "bytes_reclaimed": reclaimed,
+            "duration_s": round(time.monotonic() - started, 3),
+        }
+        return removed
+
+
+class SQLiteEventReader:
+    """Reads events from a ``SQLiteEventStore`` through its server_ts index."""
+
+    cleanup_unit = "expired events"
+
+    def __init__(self, path, max_age_days=7):
+        self.file_path = path
+        self.max_age_days = max_age_days
+        self.store = SQLiteEventStore(path)
+        self.last_cleanup = None
+
+    def read_recent(self, window_seconds=30):
+        """Read events from the last N seconds."""
+        return self.store.since(int(time.time() * 1000) - (window_seconds * 1000))
+
+    def cleanup_old_logs(self):
+        """Range-delete events older than max_age_days; returns events removed."""
+        started = time.monotonic()
+        cutoff_ts = int(time.time() * 1000) - (self.max_age_days * 24 * 60 * 60 * 1000)
+        removed, reclaimed = self.store.drop_older_than(cutoff_ts)
+        self.last_cleanup = {
+            "removed": removed,
+            "bytes_reclaimed": reclaimed,
+            "duration_s": round(time.monotonic() - started, 3),
+        }
+        return removed
+
+
+EVENT_READERS = {
+    "file": EventReader,
+    "segmented": SegmentedEventReader,
+    "sqlite": SQLiteEventReader,
+}
+
+
+def build_event_reader(backend, path, max_age_days=7):
+    """Build the event reader for a storage backend."""
+    reader_class = EVENT_READERS.get(backend)
+    if not reader_class:
+        raise ValueError(f"Unknown events backend '{backend}'. Available: {list(EVENT_READERS.keys())}")
+    return reader_class(path, max_age_days=max_age_days)
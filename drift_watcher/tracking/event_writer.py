@@ -0,0 +1,203 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .file_lock import log_lock
+from .segmented_log import SegmentedEventLog
+from .sqlite_store import SQLiteEventStore
+
+
+DURABILITY_POLICIES = ("always", "interval", "none")
+
+
+class EventWriter:
+    """Appends event batches to the log through long-lived file handles.
+
+    Durability policies:
+        always   - ``write`` returns once the batch is fsynced. Concurrent
+                   batches are group-committed: one fsync covers every batch
+                   written before it started.
+        interval - a background thread fsyncs at most every
+                   ``fsync_interval_ms``; ``write`` only flushes to the OS.
+        none     - flush to the OS only, never fsync.
+    """
+
+    def __init__(self, events_file=None, segment_log=None, durability="always", fsync_interval_ms=100):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability '{durability}'. Available: {list(DURABILITY_POLICIES)}")
+        if (events_file is None) == (segment_log is None):
+            raise ValueError("Exactly one of events_file or segment_log is required")
+
+        self.events_file = Path(events_file) if events_file is not None else None
+        self.segment_log = segment_log
+        self.durability = durability
+        self.fsync_interval_ms = fsync_interval_ms
+
+        self._handles = {}
+        self._dirty = set()
+        self._written_seq = 0
+        self._synced_seq = 0
+        self._write_lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._flusher = None
+
+        if durability == "interval":
+            self._flusher = threading.Thread(target=self._flush_loop, name="event-fsync", daemon=True)
+            self._flusher.start()
+
+    def write(self, events):
+        """Append events (dicts already stamped with server_ts) as JSON lines."""
+        if not events:
+            return
+
+        by_path = {}
+        for event in events:
+            path = self._path_for(event)
+            by_path.setdefault(path, []).append(json.dumps(event) + "\n")
+
+        with self._write_lock:
+            for path, lines in by_path.items():
+                data = "".join(lines)
+                if self.segment_log is None:
+                    # Serialises with log compaction swapping the file
+                    with log_lock(path):
+                        self._append(path, data)
+                else:
+                    self._append(path, data)
+            self._written_seq += 1
+            seq = self._written_seq
+
+        if self.durability == "always":
+            self._sync_until(seq)
+
+    def close(self):
+        """Fsync and close every open handle."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=1)
+        with self._write_lock:
+            for path in list(self._handles):
+                self._close_handle(path)
+            self._synced_seq = self._written_seq
+
+    def _path_for(self, event):
+        if self.segment_log is None:
+            return self.events_file
+        return self.segment_log.segment_path(event.get("server_ts", time.time() * 1000))
+
+    def _append(self, path, data):
+        f = self._handle(path)
+        f.write(data)
+        f.flush()
+        self._dirty.add(f)
+
+    def _handle(self, path):
+        """Return an open handle for path, reopening it if the file was replaced."""
+        f = self._handles.get(path)
+        if f is not None:
+            try:
+                current = os.stat(path).st_ino
+            except FileNotFoundError:
+                current = None
+            if current != os.fstat(f.fileno()).st_ino:
+                # Compacted (os.replace) or cleared on goal change
+                self._close_handle(path)
+                f = None
+
+        if f is None:
+            if self.segment_log is not None:
+                # Only the current hour is written to; drop older handles
+                for old in [p for p in self._handles if p != path]:
+                    self._close_handle(old)
+            f = open(path, "a")
+            self._handles[path] = f
+        return f
+
+    def _close_handle(self, path):
+        f = self._handles.pop(path)
+        if f in self._dirty and self.durability != "none":
+            os.fsync(f.fileno())
+        self._dirty.discard(f)
+        f.close()
+
+    def _sync_until(self, seq):
+        """Fsync dirty handles unless a concurrent fsync already covered seq."""
+        with self._sync_lock:
+            if self._synced_seq >= seq:
+                return
+            with self._write_lock:
+                target = self._written_seq
+                dirty = list(self._dirty)
+                self._dirty.clear()
+            for f in dirty:
+                try:
+                    os.fsync(f.fileno())
+                except ValueError:
+                    pass  # closed meanwhile; _close_handle synced it
+            self._synced_seq = target
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.fsync_interval_ms / 1000):
+            if self._synced_seq < self._written_seq:
+                try:
+                    self._sync_until(self._written_seq)
+                except OSError as e:
+                    print(f"⚠️ Event log fsync failed: {e}")
+
+
+class SQLiteEventWriter:
+    """Inserts event batches into a ``SQLiteEventStore`` over one connection.
+
+    Each batch is one transaction. The durability policy maps to SQLite's
+    ``synchronous`` setting: ``always`` fsyncs the WAL on every commit
+    (FULL), ``interval`` leaves syncing to WAL checkpoints (NORMAL) and
+    ``none`` never syncs (OFF).
+    """
+
+    SYNCHRONOUS = {"always": "FULL", "interval": "NORMAL", "none": "OFF"}
+
+    def __init__(self, store, durability="always"):
+        if durability not in DURABILITY_POLICIES:
+            raise ValueError(f"Unknown durability '{durability}'. Available: {list(DURABILITY_POLICIES)}")
+        self.store = store
+        self.durability = durability
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(store.path, timeout=5, check_same_thread=False)
+        self._db.execute(f"PRAGMA synchronous={self.SYNCHRONOUS[durability]}")
+
+    def write(self, events):
+        """Insert events (dicts already stamped with server_ts) in one transaction."""
+        if not events:
+            return
+        with self._lock, self._db:
+            self.store.append(events, self._db)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def build_event_writer(events_file="events.log", events_backend="file", durability="always", fsync_interval_ms=100):
+    """Build the writer for a storage backend, migrating a legacy log into segments or SQLite."""
+    if events_backend == "segmented":
+        segment_log = SegmentedEventLog(events_file)
+        migrated = segment_log.migrate()
+        if migrated:
+            print(f"📦 Migrated {migrated} events from events.log into {events_file}/")
+        return EventWriter(segment_log=segment_log, durability=durability, fsync_interval_ms=fsync_interval_ms)
+
+    if events_backend == "sqlite":
+        store = SQLiteEventStore(events_file)
+        migrated = store.migrate()
+        if migrated:
+            print(f"📦 Migrated {migrated} events from events.log into {events_file}")
+        return SQLiteEventWriter(store, durability=durability)
+
+    if events_backend != "file":
+        raise ValueError(f"Unknown events backend '{events_backend}'. Available: ['file', 'segmented', 'sqlite']")
+    Path(events_file).touch(exist_ok=True)
+    return EventWriter(events_file=events_file, durability=durability, fsync_interval_ms=fsync_interval_ms)
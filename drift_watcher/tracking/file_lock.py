@@ -0,0 +1,26 @@
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, fall back to no locking
+    fcntl = None
+
+
+@contextmanager
+def log_lock(path):
+    """Hold an exclusive advisory lock on ``<path>.lock``.
+
+    The event server takes this lock around each append and log compaction
+    takes it while swapping in the compacted file, so the two processes never
+    interleave a write with the final copy-and-replace.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(f"{path}.lock", "a") as lock_file:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
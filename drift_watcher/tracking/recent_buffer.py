@@ -0,0 +1,76 @@
+import threading
+import time
+from collections import deque
+
+
+class RecentEventsBuffer:
+    """Bounded in-memory buffer of the most recent events, ordered by server_ts.
+
+    The buffer knows from which timestamp on it holds every event it
+    received (``covered_from_ts``): the server start, or the newest event it
+    had to evict. Queries reaching further back are answered as incomplete
+    so readers can fall back to the event log. ``wait_newer`` lets a
+    client block until events newer than a timestamp arrive.
+    """
+
+    MAX_WAIT_SECONDS = 30
+
+    def __init__(self, max_events=10000, max_age_seconds=3600):
+        self.max_events = max_events
+        self.max_age_seconds = max_age_seconds
+        self._events = deque()
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+        self.covered_from_ts = int(time.time() * 1000)
+        self.newest_ts = 0
+
+    def extend(self, events):
+        """Add events (stamped with server_ts) and evict what falls out of bounds."""
+        cutoff_ts = int(time.time() * 1000) - self.max_age_seconds * 1000
+        with self._lock:
+            for event in events:
+                self._insert(event)
+                self.newest_ts = max(self.newest_ts, event.get("server_ts", 0))
+            while self._events and (
+                len(self._events) > self.max_events
+                or self._events[0].get("server_ts", 0) < cutoff_ts
+            ):
+                evicted = self._events.popleft()
+                self.covered_from_ts = max(self.covered_from_ts, evicted.get("server_ts", 0) + 1)
+            if events:
+                self._arrived.notify_all()
+
+    def _insert(self, event):
+        # Concurrent requests can finish out of stamp order; keep the tail sorted
+        ts = event.get("server_ts", 0)
+        index = len(self._events)
+        while index > 0 and self._events[index - 1].get("server_ts", 0) > ts:
+            index -= 1
+        self._events.insert(index, event)
+
+    def since(self, since_ts):
+        """Return {"events", "complete", "covered_from_ts"} for events at or after since_ts."""
+        with self._lock:
+            # Recent windows sit at the tail: walk back only as far as needed
+            found = []
+            for event in reversed(self._events):
+                if event.get("server_ts", 0) < since_ts:
+                    break
+                found.append(event)
+            covered_from_ts = self.covered_from_ts
+        found.reverse()
+        return {
+            "events": found,
+            "complete": since_ts >= covered_from_ts,
+            "covered_from_ts": covered_from_ts,
+        }
+
+    def wait_newer(self, after_ts, timeout):
+        """Block until an event newer than after_ts arrives or timeout passes.
+
+        Returns {"newest_ts", "new"}; ``new`` is False on timeout.
+        """
+        timeout = min(max(timeout, 0), self.MAX_WAIT_SECONDS)
+        with self._arrived:
+            new = self._arrived.wait_for(lambda: self.newest_ts > after_ts, timeout)
+            return {"newest_ts": self.newest_ts, "new": bool(new)}
@@ -0,0 +1,171 @@
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from ..utils.urls import domain_of
+
+
+class RollupStore:
+    """Minute, hour and day totals of tracked time per domain and per verdict.
+
+    The event server adds every event's duration to the buckets of its
+    domain, the agent adds each window's new tracked time to the buckets
+    of its verdict. Additions are summed in memory and upserted into one
+    SQLite table (WAL mode) every ``flush_seconds``, so ingest never waits
+    on the database; a crash loses at most that much. Each bucket is one
+    row keyed by (resolution, series, bucket start, key), and old minute
+    and hour buckets are pruned while day buckets are kept, so totals
+    outlive ``log_retention_days``. Queries read only these rows.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rollups (
+        resolution TEXT NOT NULL,
+        series TEXT NOT NULL,
+        bucket INTEGER NOT NULL,
+        key TEXT NOT NULL,
+        ms INTEGER NOT NULL,
+        PRIMARY KEY (resolution, series, bucket, key)
+    ) WITHOUT ROWID;
+    """
+    RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+    RETENTION_SECONDS = {"minute": 2 * 86400, "hour": 90 * 86400, "day": None}
+    SERIES = ("domain", "verdict")
+    MAX_POINTS = 5000
+    PRUNE_INTERVAL_SECONDS = 3600
+
+    def __init__(self, path="rollups.db", flush_seconds=5.0):
+        self.path = Path(path)
+        self.flush_seconds = flush_seconds
+        self._pending = defaultdict(int)   # (resolution, series, bucket, key) -> ms
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._last_prune = 0.0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            db.execute("PRAGMA synchronous=NORMAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _add(self, series, key, ts, ms):
+        for resolution, width in self.RESOLUTIONS.items():
+            self._pending[(resolution, series, int(ts // width * width), key)] += ms
+
+    def add_events(self, events):
+        """Add each event's duration to its domain (bucketed by server_ts)."""
+        with self._lock:
+            for event in events:
+                ms = int(event.get("durationMs") or 0)
+                if ms <= 0:
+                    continue
+                domain = domain_of(event.get("url") or "") or "unknown"
+                self._add("domain", domain, event.get("server_ts", 0) / 1000, ms)
+
+    def add_verdict(self, verdict, ms, ts=None):
+        """Add tracked time to a focus verdict (FOCUSED / DRIFTING)."""
+        if ms <= 0:
+            return
+        with self._lock:
+            self._add("verdict", verdict, time.time() if ts is None else ts, int(ms))
+
+    def flush(self):
+        """Write pending additions in one transaction."""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+        if pending:
+            with self._connect() as db:
+                db.executemany(
+                    "INSERT INTO rollups (resolution, series, bucket, key, ms) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (resolution, series, bucket, key) DO UPDATE SET ms = ms + excluded.ms",
+                    [key + (ms,) for key, ms in pending.items()]
+                )
+        if time.time() - self._last_prune >= self.PRUNE_INTERVAL_SECONDS:
+            self.prune()
+
+    def prune(self):
+        """Drop minute and hour buckets past their retention."""
+        now = time.time()
+        self._last_prune = now
+        with self._connect() as db:
+            for resolution, keep in self.RETENTION_SECONDS.items():
+                if keep is not None:
+                    db.execute(
+                        "DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                        (resolution, int(now - keep))
+                    )
+
+    def start(self):
+        """Flush on a background thread every ``flush_seconds``."""
+        self._thread = threading.Thread(target=self._run, name="rollup-flusher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stopped.wait(self.flush_seconds):
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                print(f"⚠️  Rollup flush failed: {e}")
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def query(self, series="domain", resolution="hour", start=None, end=None, keys=None, top=None):
+        """Per-key minutes for each bucket in [start, end), in epoch seconds.
+
+        Returns {"series", "resolution", "start", "end", "buckets": [bucket
+        starts], "values": {key: [minutes per bucket]}, "totals": {key:
+        minutes}}, keys ordered by total time. ``top`` keeps the N largest.
+        Raises ValueError on unknown series/resolution or too many buckets.
+        """
+        if series not in self.SERIES:
+            raise ValueError(f"series must be one of {list(self.SERIES)}")
+        if resolution not in self.RESOLUTIONS:
+            raise ValueError(f"resolution must be one of {list(self.RESOLUTIONS)}")
+        width = self.RESOLUTIONS[resolution]
+        end = int(time.time() if end is None else end)
+        start = end - 24 * width if start is None else start
+        first = int(start // width * width)
+        buckets = list(range(first, end, width))
+        if len(buckets) > self.MAX_POINTS:
+            raise ValueError(f"Range covers {len(buckets)} {resolution} buckets, at most {self.MAX_POINTS}")
+
+        # Make what the server has ingested so far visible
+        self.flush()
+        sql = "SELECT key, bucket, ms FROM rollups WHERE resolution = ? AND series = ? AND bucket >= ? AND bucket < ?"
+        params = [resolution, series, first, end]
+        if keys:
+            sql += f" AND key IN ({', '.join('?' * len(keys))})"
+            params.extend(keys)
+        with self._connect() as db:
+            rows = db.execute(sql, params).fetchall()
+
+        values = {}
+        for key, bucket, ms in rows:
+            values.setdefault(key, [0.0] * len(buckets))[(bucket - first) // width] = round(ms / 60000, 2)
+        totals = {key: round(sum(points), 2) for key, points in values.items()}
+        ranked = sorted(totals, key=totals.get, reverse=True)[:top]
+        return {
+            "series": series,
+            "resolution": resolution,
+            "start": first,
+            "end": end,
+            "buckets": buckets,
+            "values": {key: values[key] for key in ranked},
+            "totals": {key: totals[key] for key in ranked},
+        }
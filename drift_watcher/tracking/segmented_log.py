@@ -0,0 +1,134 @@
+import calendar
+import json
+import os
+import time
+from pathlib import Path
+
+
+class SegmentedEventLog:
+    """Event log split into one JSONL file per hour under a directory.
+
+    Segment files are named after the UTC hour they cover
+    (``20261018-14.log``), so finding the events of a recent window only
+    touches the last one or two files and retention is a matter of deleting
+    whole expired segments.
+    """
+
+    SEGMENT_SECONDS = 3600
+    SUFFIX = ".log"
+
+    def __init__(self, directory="events"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def segment_start(self, ts_ms):
+        """Return the start (ms) of the segment containing ts_ms."""
+        span = self.SEGMENT_SECONDS * 1000
+        return int(ts_ms) // span * span
+
+    def segment_path(self, ts_ms):
+        """Return the segment file that holds events stamped ts_ms."""
+        name = time.strftime("%Y%m%d-%H", time.gmtime(self.segment_start(ts_ms) / 1000))
+        return self.directory / f"{name}{self.SUFFIX}"
+
+    def segments(self):
+        """List (start_ms, path) for every segment, oldest first."""
+        found = []
+        for path in self.directory.glob(f"*{self.SUFFIX}"):
+            try:
+                start = time.strptime(path.stem, "%Y%m%d-%H")
+            except ValueError:
+                continue
+            found.append((calendar.timegm(start) * 1000, path))
+        found.sort()
+        return found
+
+    def segments_since(self, ts_ms):
+        """List segment paths that may contain events at or after ts_ms."""
+        first = self.segment_start(ts_ms)
+        return [path for start, path in self.segments() if start >= first]
+
+    def append(self, event):
+        """Append one event to its segment and fsync it."""
+        path = self.segment_path(event.get("server_ts", time.time() * 1000))
+        with path.open("a") as f:
+            f.write(json.dumps(event) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def drop_older_than(self, cutoff_ms):
+        """Delete segments whose whole hour ends before cutoff_ms.
+
+        Returns (segments removed, bytes reclaimed).
+        """
+        span = self.SEGMENT_SECONDS * 1000
+        removed = 0
+        reclaimed = 0
+        for start, path in self.segments():
+            if start + span > cutoff_ms:
+                break
+            try:
+                size = path.stat().st_size
+                path.unlink()
+            except FileNotFoundError:
+                continue
+            removed += 1
+            reclaimed += size
+        return removed, reclaimed
+
+    def clear(self):
+        """Delete every segment."""
+        for _, path in self.segments():
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                continue
+
+    def migrate(self, legacy_file="events.log"):
+        """Move events from a single-file log into segments.
+
+        The legacy file is first renamed to ``<name>.migrating`` so that a
+        concurrent writer can't append to it while it is being split. An
+        interrupted migration is resumed from the start of that file on the
+        next call, so lines written before the interruption may be repeated.
+        """
+        legacy = Path(legacy_file)
+        pending = legacy.with_name(legacy.name + ".migrating")
+        migrated = 0
+
+        # Finish an interrupted run before taking over the live file
+        if pending.exists():
+            migrated += self._split(pending)
+        if legacy.is_file():
+            try:
+                os.replace(legacy, pending)
+            except FileNotFoundError:
+                return migrated
+            migrated += self._split(pending)
+        return migrated
+
+    def _split(self, source):
+        """Append every event in source to its segment, then delete source."""
+        migrated = 0
+        handles = {}
+        try:
+            with source.open("r") as src:
+                for line in src:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    path = self.segment_path(event.get("server_ts", 0))
+                    if path not in handles:
+                        handles[path] = path.open("a")
+                    handles[path].write(line if line.endswith("\n") else line + "\n")
+                    migrated += 1
+            for f in handles.values():
+                f.flush()
+                os.fsync(f.fileno())
+        finally:
+            for f in handles.values():
+                f.close()
+
+        source.unlink()
+        return migrated
@@ -1,16 +1,70 @@
+import gzip
 import json
 import time
-import os
 from pathlib import Path
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
+
+from ..utils.metrics import CONTENT_TYPE
+from .api import (
+    DASHBOARD_DIR, INGEST_ERRORS, INGEST_SECONDS, SSE_KEEPALIVE_SECONDS, DashboardState, EventChannel,
+    ProfileViews, metrics_text, query_params, sse_message, timeseries_payload
+)
+from .event_writer import build_event_writer
+from .recent_buffer import RecentEventsBuffer
+
+
+MAX_BATCH_EVENTS = 1000
+
+
+def parse_event_batch(body, content_encoding=""):
+    """Decode a /events body: a JSON array (or {"events": [...]}), optionally gzipped."""
+    if "gzip" in (content_encoding or "").lower():
+        body = gzip.decompress(body)
+    payload = json.loads(body)
+    events = payload.get("events") if isinstance(payload, dict) else payload
+    if not isinstance(events, list):
+        raise ValueError("Expected a JSON array of events")
+    if len(events) > MAX_BATCH_EVENTS:
+        raise ValueError(f"Batch too large: {len(events)} > {MAX_BATCH_EVENTS} events")
+    if not all(isinstance(e, dict) for e in events):
+        raise ValueError("Every event must be a JSON object")
+    return events
+
+
+def stamp_events(events):
+    """Set server_ts on each event; a batch shares one receive timestamp."""
+    now = int(time.time() * 1000)
+    for event in events:
+        event["server_ts"] = now
+    return events
 
 
 class EventServer:
     """Flask server for receiving browser events."""
     
-    def __init__(self, events_file="events.log", host="127.0.0.1", port=3333):
-        self.events_file = Path(events_file)
-        self.events_file.touch(exist_ok=True)
+    def __init__(self, events_file="events.log", host="127.0.0.1", port=3333, events_backend="file",
+                 durability="always", fsync_interval_ms=100, buffer_max_events=10000,
+                 buffer_max_age_seconds=3600, state_manager=None, rollups=None, metrics_file=None,
+                 profiles=None):
+        self.events_backend = events_backend
+        self.rollups = rollups
+        self.metrics_file = metrics_file
+        self.writer = build_event_writer(events_file, events_backend, durability, fsync_interval_ms)
+        self.recent = RecentEventsBuffer(buffer_max_events, buffer_max_age_seconds)
+
+        def open_channel(path, backend, channel_rollups):
+            return EventChannel(
+                build_event_writer(path, backend, durability, fsync_interval_ms),
+                RecentEventsBuffer(buffer_max_events, buffer_max_age_seconds),
+                channel_rollups
+            )
+
+        # Without a profiles list the server's own state and rollups are the only profile
+        self.profiles = ProfileViews(
+            profiles or {"default": (state_manager, rollups, None)},
+            EventChannel(self.writer, self.recent, rollups),
+            open_channel
+        )
         self.host = host
         self.port = port
         self.app = Flask(__name__)
@@ -21,19 +75,75 @@ class EventServer:
         
         @self.app.route("/event", methods=["POST"])
         def receive_event():
-            try:
-                event = request.get_json(force=True)
-                event["server_ts"] = int(time.time() * 1000)
+            with INGEST_SECONDS.time(route="event"):
+                try:
+                    channel = self.profiles.channel(request.args)
+                except LookupError as e:
+                    INGEST_ERRORS.inc(route="event")
+                    return jsonify({"error": str(e)}), 404
+                try:
+                    events = stamp_events([request.get_json(force=True)])
+                    self._ingest(channel, events)
+                    
+                    return jsonify({"status": "ok"}), 200
                 
-                with self.events_file.open("a") as f:
-                    f.write(json.dumps(event) + "\n")
-                    f.flush()
-                    os.fsync(f.fileno())
+                except Exception as e:
+                    INGEST_ERRORS.inc(route="event")
+                    return jsonify({"error": str(e)}), 400
+        
+        @self.app.route("/events", methods=["POST"])
+        def receive_events():
+            """Receive a batch of events, committed with a single write."""
+            with INGEST_SECONDS.time(route="events"):
+                try:
+                    channel = self.profiles.channel(request.args)
+                except LookupError as e:
+                    INGEST_ERRORS.inc(route="events")
+                    return jsonify({"error": str(e)}), 404
+                try:
+                    events = parse_event_batch(
+                        request.get_data(),
+                        request.headers.get("Content-Encoding", "")
+                    )
+                    self._ingest(channel, stamp_events(events))
+                    
+                    return jsonify({"status": "ok", "accepted": len(events)}), 200
                 
-                return jsonify({"status": "ok"}), 200
-            
-            except Exception as e:
-                return jsonify({"error": str(e)}), 400
+                except Exception as e:
+                    INGEST_ERRORS.inc(route="events")
+                    return jsonify({"error": str(e)}), 400
+        
+        @self.app.route("/metrics", methods=["GET"])
+        def metrics():
+            """Prometheus text exposition: server metrics plus the agent's last published ones."""
+            return Response(metrics_text(self.metrics_file), content_type=CONTENT_TYPE)
+        
+        @self.app.route("/api/events", methods=["GET"])
+        def get_events():
+            """Recent events from the in-memory buffer (?since=<server_ts ms>&profile=)."""
+            try:
+                since_ts = int(request.args.get("since", 0))
+            except ValueError:
+                return jsonify({"error": "since must be a timestamp in ms"}), 400
+            try:
+                channel = self.profiles.channel(request.args)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            return jsonify(channel.recent.since(since_ts)), 200
+        
+        @self.app.route("/api/events/wait", methods=["GET"])
+        def wait_events():
+            """Long-poll until events newer than ?after=<server_ts ms> arrive (?timeout=<s>&profile=)."""
+            try:
+                after_ts = int(request.args.get("after", 0))
+                timeout = float(request.args.get("timeout", 25))
+            except ValueError:
+                return jsonify({"error": "after must be a timestamp in ms, timeout in seconds"}), 400
+            try:
+                channel = self.profiles.channel(request.args)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            return jsonify(channel.recent.wait_newer(after_ts, timeout)), 200
         
         @self.app.route("/health", methods=["GET"])
         def health():
@@ -42,85 +152,168 @@ class EventServer:
         @self.app.route("/dashboard", methods=["GET"])
         def dashboard():
             """Serve dashboard HTML."""
-            dashboard_dir = Path(__file__).parent.parent / "dashboard"
-            return send_from_directory(dashboard_dir, "index.html")
+            return send_from_directory(DASHBOARD_DIR, "index.html")
         
         @self.app.route("/dashboard.js", methods=["GET"])
         def dashboard_js():
             """Serve dashboard JavaScript."""
-            dashboard_dir = Path(__file__).parent.parent / "dashboard"
-            return send_from_directory(dashboard_dir, "dashboard.js")
+            return send_from_directory(DASHBOARD_DIR, "dashboard.js")
         
         @self.app.route("/dashboard.css", methods=["GET"])
         def dashboard_css():
             """Serve dashboard CSS."""
-            dashboard_dir = Path(__file__).parent.parent / "dashboard"
-            return send_from_directory(dashboard_dir, "dashboard.css")
+            return send_from_directory(DASHBOARD_DIR, "dashboard.css")
         
         @self.app.route("/api/stats", methods=["GET"])
         def get_stats():
             """Get current stats for dashboard."""
-            try:
-                from ..core.state_manager import StateManager
-                from ..tracking.event_reader import EventReader
-                
-                state_manager = StateManager()
-                state = state_manager.load()
-                
-                # Calculate session time
-                session_minutes = 0
-                if state.get("session_start_ts") and state.get("session_start_ts") > 0:
-                    session_minutes = max(0, int((time.time() - state["session_start_ts"]) / 60))
-                
-                # Format last check time
-                last_check = "Never"
-                if state.get("last_check_ts") and state.get("last_check_ts") > 0:
-                    seconds_ago = max(0, int(time.time() - state["last_check_ts"]))
-                    if seconds_ago < 60:
-                        last_check = f"{seconds_ago}s"
-                    elif seconds_ago < 3600:
-                        last_check = f"{seconds_ago // 60}m"
-                    else:
-                        last_check = f"{seconds_ago // 3600}h"
-                
-                return jsonify({
-                    "goal": state.get("goal", "No goal set"),
-                    "focus_state": state.get("focus_state", "UNKNOWN"),
-                    "confidence": state.get("confidence", 0.0),
-                    "drift_count": state.get("drift_count", 0),
-                    "session_minutes": session_minutes,
-                    "last_check": last_check,
-                    "relevant_percent": state.get("relevant_percent", 0.0),
-                    "irrelevant_percent": state.get("irrelevant_percent", 0.0),
-                }), 200
-            
-            except Exception as e:
-                return jsonify({"error": str(e)}), 500
+            return self._cached("stats")
         
         @self.app.route("/api/history", methods=["GET"])
         def get_history():
-            """Get session history."""
+            """Get a page of session history (?limit=&before=<next_before>)."""
+            return self._cached("history")
+        
+        @self.app.route("/api/history/summary", methods=["GET"])
+        def get_history_summary():
+            """Get per-day/week history totals (?days=&weeks=)."""
+            return self._cached("summary")
+        
+        @self.app.route("/api/timeseries", methods=["GET"])
+        def get_timeseries():
+            """Time per domain or verdict from the rollups (?series=&resolution=&start=&end=&keys=&top=&profile=)."""
             try:
-                from ..core.state_manager import StateManager
-                
-                state_manager = StateManager()
-                history = state_manager.load_history()
-                
-                # Sort by end time descending
-                history.sort(key=lambda x: x.get("end_ts", 0), reverse=True)
-                
-                return jsonify({"sessions": history}), 200
+                rollups = self.profiles.timeseries_store(request.args)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
+            if rollups is None:
+                return jsonify({"error": "Rollups are disabled (storage.rollups)"}), 404
+            try:
+                return jsonify(timeseries_payload(rollups, request.args)), 200
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+        
+        @self.app.route("/api/stream", methods=["GET"])
+        def stream():
+            """Server-Sent Events: stats/history/summary pushed when the agent writes new state."""
+            try:
+                dashboard = self.profiles.dashboard(request.args)
+            except LookupError as e:
+                return jsonify({"error": str(e)}), 404
             
-            except Exception as e:
-                return jsonify({"error": str(e)}), 500
+            def messages():
+                known = {}
+                while True:
+                    changed = dashboard.changes(known, SSE_KEEPALIVE_SECONDS)
+                    if not changed:
+                        yield ": keepalive\n\n"
+                        continue
+                    for name, (payload, etag) in changed.items():
+                        known[name] = etag
+                        yield sse_message(name, payload)
+            
+            return Response(messages(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache"})
+    
+    def _ingest(self, channel, events):
+        channel.writer.write(events)
+        channel.add(events)
+    
+    def _cached(self, name):
+        """Serve a dashboard payload from cache, 304 if the client's ETag still matches."""
+        try:
+            params = query_params(name, request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        try:
+            dashboard = self.profiles.dashboard(request.args)
+        except LookupError as e:
+            return jsonify({"error": str(e)}), 404
+        try:
+            payload, etag = dashboard.get(name, **params)
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if DashboardState.not_modified(request.headers.get("If-None-Match"), etag):
+            return Response(status=304, headers=headers)
+        response = jsonify(payload)
+        response.headers.update(headers)
+        return response
     
     def run(self, debug=False):
         """Start the server."""
-        self.app.run(
-            host=self.host,
-            port=self.port,
-            debug=debug
-        )
+        channels = self.profiles.all_channels()
+        for channel in channels:
+            if channel.rollups is not None:
+                channel.rollups.start()
+        try:
+            self.app.run(
+                host=self.host,
+                port=self.port,
+                debug=debug
+            )
+        finally:
+            for channel in channels:
+                channel.writer.close()
+                if channel.rollups is not None:
+                    channel.rollups.close()
+
+
+def build_server(config=None, host=None, port=None, mode=None):
+    """Build the event server in the requested mode ("flask" or "async").
+
+    Storage and durability settings come from config when one is given;
+    host, port and mode override the config values.
+    """
+    options = {}
+    if config is not None:
+        from ..core.state_manager import build_state_manager
+        from .rollups import RollupStore
+        profiles = None
+        profile_configs = config.profiles()
+        if profile_configs != [config]:
+            # Each profile's agent writes its own state files and verdict rollups
+            for c in profile_configs:
+                Path(c.state_file).parent.mkdir(parents=True, exist_ok=True)
+                Path(c.events_path).parent.mkdir(parents=True, exist_ok=True)
+            profiles = {
+                c.profile_name: (
+                    build_state_manager(c.state_backend, c.state_file, c.history_file, c.state_db),
+                    RollupStore(c.rollups_db) if c.rollups_enabled else None,
+                    # Profiles that keep the top-level events_path share the server's log
+                    None if (c.events_path, c.events_backend) == (config.events_path, config.events_backend)
+                    else (c.events_path, c.events_backend),
+                )
+                for c in profile_configs
+            }
+        options = {
+            "events_file": config.events_path,
+            "host": config.server_host,
+            "port": config.server_port,
+            "events_backend": config.events_backend,
+            "durability": config.server_durability,
+            "fsync_interval_ms": config.fsync_interval_ms,
+            "buffer_max_events": config.buffer_max_events,
+            "buffer_max_age_seconds": config.buffer_max_age_seconds,
+            "state_manager": None if profiles else build_state_manager(
+                config.state_backend, config.state_file, config.history_file, config.state_db
+            ),
+            "rollups": RollupStore(config.rollups_db) if config.rollups_enabled else None,
+            "metrics_file": config.metrics_file,
+            "profiles": profiles,
+        }
+        mode = mode or config.server_mode
+    if host is not None:
+        options["host"] = host
+    if port is not None:
+        options["port"] = port
+
+    mode = mode or "flask"
+    if mode == "async":
+        from .async_server import AsyncEventServer
+        return AsyncEventServer(**options)
+    if mode != "flask":
+        raise ValueError(f"Unknown server mode '{mode}'. Available: ['flask', 'async']")
+    return EventServer(**options)
 
 
 def main(config_file="config.json"):
@@ -128,11 +321,8 @@ def main(config_file="config.json"):
     from ..config import Config
     
     config = Config(config_file)
-    server = EventServer(
-        host=config.server_host,
-        port=config.server_port
-    )
-    print(f"🌐 Event server starting on {config.server_host}:{config.server_port}")
+    server = build_server(config)
+    print(f"🌐 Event server starting on {server.host}:{server.port} ({config.server_mode})")
     server.run()
 
 
@@ -0,0 +1,60 @@
+import time
+
+import requests
+
+
+class ServerEventReader:
+    """Reads recent windows from the event server's in-memory buffer.
+
+    Falls back to the wrapped log reader when the server is unreachable or
+    its buffer doesn't reach back far enough yet (e.g. right after a server
+    restart). Log maintenance is always delegated to the fallback reader.
+    With ``profile`` it reads that profile's buffer.
+    """
+
+    def __init__(self, base_url, fallback, timeout=2.0, profile=None):
+        self.base_url = base_url.rstrip("/")
+        self.fallback = fallback
+        self.params = {"profile": profile} if profile else {}
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._bytes_fetched = 0
+
+    @property
+    def bytes_read(self):
+        """Bytes fetched from the server plus bytes the fallback read from disk."""
+        return self._bytes_fetched + getattr(self.fallback, "bytes_read", 0)
+
+    @property
+    def file_path(self):
+        return self.fallback.file_path
+
+    @property
+    def cleanup_unit(self):
+        return getattr(self.fallback, "cleanup_unit", "old log entries")
+
+    @property
+    def last_cleanup(self):
+        return getattr(self.fallback, "last_cleanup", None)
+
+    def read_recent(self, window_seconds=30):
+        """Read events from the last N seconds."""
+        since_ts = int(time.time() * 1000) - (window_seconds * 1000)
+        try:
+            response = self.session.get(
+                f"{self.base_url}/api/events",
+                params={"since": since_ts, **self.params},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            self._bytes_fetched += len(response.content)
+            payload = response.json()
+        except (requests.RequestException, ValueError):
+            return self.fallback.read_recent(window_seconds)
+
+        if not payload.get("complete"):
+            return self.fallback.read_recent(window_seconds)
+        return payload.get("events", [])
+
+    def cleanup_old_logs(self):
+        return self.fallback.cleanup_old_logs()
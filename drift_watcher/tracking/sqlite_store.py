@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+from ..utils.urls import domain_of, normalize_url
+
+
+class SQLiteEventStore:
+    """Events in an SQLite table (WAL mode), indexed by time, domain and URL.
+
+    Each event is stored as its JSON document plus the columns queries
+    filter on: ``server_ts``, the normalized domain and URL, and the
+    duration. Recent windows, per-domain totals and per-URL lookups are
+    index range scans instead of a scan of the whole log, and retention is
+    a single range delete.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        server_ts INTEGER NOT NULL,
+        domain TEXT NOT NULL,
+        url TEXT NOT NULL,
+        duration_ms INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS events_server_ts ON events (server_ts);
+    CREATE INDEX IF NOT EXISTS events_domain_ts ON events (domain, server_ts);
+    CREATE INDEX IF NOT EXISTS events_url ON events (url);
+    """
+    HEADER = b"SQLite format 3\x00"
+    MIGRATE_BATCH = 1000
+
+    def __init__(self, path="events.db"):
+        self.path = Path(path)
+        with self.connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.executescript(self.SCHEMA)
+
+    @classmethod
+    def is_store(cls, path) -> bool:
+        """True if path is an SQLite database file."""
+        try:
+            with open(path, "rb") as f:
+                return f.read(len(cls.HEADER)) == cls.HEADER
+        except (FileNotFoundError, IsADirectoryError):
+            return False
+
+    @contextmanager
+    def connect(self, synchronous="NORMAL"):
+        """Short-lived connection; commits on success."""
+        db = sqlite3.connect(self.path, timeout=5)
+        try:
+            db.execute(f"PRAGMA synchronous={synchronous}")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    @staticmethod
+    def row(event):
+        url = event.get("url") or ""
+        return (
+            int(event.get("server_ts", 0)),
+            domain_of(url),
+            normalize_url(url),
+            int(event.get("durationMs") or 0),
+            json.dumps(event),
+        )
+
+    def append(self, events, db=None):
+        """Insert events in one batch (in db's transaction if given)."""
+        rows = [self.row(event) for event in events]
+        if db is not None:
+            db.executemany(
+                "INSERT INTO events (server_ts, domain, url, duration_ms, data) VALUES (?, ?, ?, ?, ?)", rows
+            )
+            return
+        with self.connect() as db:
+            self.append(events, db)
+
+    def since(self, ts_ms):
+        """Events stamped at or after ts_ms, oldest first."""
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT data FROM events WHERE server_ts >= ? ORDER BY server_ts, id", (int(ts_ms),)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def for_url(self, url, since_ts=0):
+        """Events for a URL (normalized), oldest first."""
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT data FROM events WHERE url = ? AND server_ts >= ? ORDER BY server_ts, id",
+                (normalize_url(url), int(since_ts))
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def time_per_domain(self, since_ts=0):
+        """Minutes per domain for events at or after since_ts, most time first."""
+        with self.connect() as db:
+            rows = db.execute(
+                "SELECT domain, SUM(duration_ms) AS ms FROM events WHERE server_ts >= ? "
+                "GROUP BY domain ORDER BY ms DESC",
+                (int(since_ts),)
+            ).fetchall()
+        return {domain: round(ms / 60000, 2) for domain, ms in rows}
+
+    def last_id(self) -> int:
+        """Id of the newest event; grows with every insert."""
+        with self.connect() as db:
+            row = db.execute("SELECT seq FROM sqlite_sequence WHERE name = 'events'").fetchone()
+        return row[0] if row else 0
+
+    def drop_older_than(self, cutoff_ms):
+        """Delete events stamped before cutoff_ms.
+
+        Returns (events removed, bytes freed for reuse inside the file).
+        """
+        with self.connect() as db:
+            page_size = db.execute("PRAGMA page_size").fetchone()[0]
+            free_before = db.execute("PRAGMA freelist_count").fetchone()[0]
+            removed = db.execute("DELETE FROM events WHERE server_ts < ?", (int(cutoff_ms),)).rowcount
+            free_after = db.execute("PRAGMA freelist_count").fetchone()[0]
+        return removed, max(0, free_after - free_before) * page_size
+
+    def clear(self):
+        """Delete every event."""
+        with self.connect() as db:
+            db.execute("DELETE FROM events")
+
+    def migrate(self, legacy_file="events.log"):
+        """Move events from a single-file log into the store.
+
+        Same protocol as ``SegmentedEventLog.migrate``: the legacy file is
+        renamed to ``<name>.migrating`` first and an interrupted migration is
+        resumed from the start of that file.
+        """
+        legacy = Path(legacy_file)
+        pending = legacy.with_name(legacy.name + ".migrating")
+        migrated = 0
+
+        if pending.exists():
+            migrated += self._import(pending)
+        if legacy.is_file():
+            try:
+                os.replace(legacy, pending)
+            except FileNotFoundError:
+                return migrated
+            migrated += self._import(pending)
+        return migrated
+
+    def _import(self, source):
+        """Insert every event in source in one transaction, then delete source."""
+        migrated = 0
+        with self.connect() as db, source.open("r") as src:
+            batch = []
+            for line in src:
+                try:
+                    batch.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+                if len(batch) >= self.MIGRATE_BATCH:
+                    self.append(batch, db)
+                    migrated += len(batch)
+                    batch = []
+            self.append(batch, db)
+            migrated += len(batch)
+        source.unlink()
+        return migrated
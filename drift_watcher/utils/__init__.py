@@ -1,3 +1,5 @@
+from .metrics import METRICS, MetricsRegistry
 from .notifier import Notifier
+from .urls import domain_of, normalize_url
 
-__all__ = ["Notifier"]
+__all__ = ["METRICS", "MetricsRegistry", "Notifier", "domain_of", "normalize_url"]
@@ -0,0 +1,93 @@
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that identify a campaign or click, not the page
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "igshid", "_hsenc", "_hsmi",
+}
+TRACKING_PREFIXES = ("utm_",)
+
+# Names that are tracking on these sites (and their subdomains) but select
+# content elsewhere, e.g. GitHub's ``?ref=<branch>``
+HOST_TRACKING_PARAMS = {
+    "youtube.com": {"si", "feature", "pp"},
+    "youtu.be": {"si", "feature"},
+    "open.spotify.com": {"si"},
+    "twitter.com": {"ref_src", "ref_url", "s"},
+    "x.com": {"ref_src", "ref_url", "s"},
+    "aliexpress.com": {"spm"},
+    "taobao.com": {"spm"},
+}
+
+# Playback positions on video sites: the same video at another timestamp
+# is the same page. Elsewhere ``t`` can select content (a tab, a thread)
+HOST_TIMESTAMP_PARAMS = {
+    "youtube.com": {"t", "time_continue", "start"},
+    "youtu.be": {"t", "time_continue", "start"},
+    "youtube-nocookie.com": {"start"},
+    "vimeo.com": {"t"},
+    "twitch.tv": {"t"},
+    "dailymotion.com": {"start"},
+}
+
+
+def _host_params(table: dict, host: str) -> set:
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        params = table.get(".".join(labels[i:]))
+        if params is not None:
+            return params
+    return set()
+
+
+def _is_tracking(name: str, host_params=frozenset()) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES) or name in host_params
+
+
+def normalize_url(url: str, drop_timestamps: bool = False) -> str:
+    """Canonical form of a URL for grouping and caching.
+
+    Lowercases scheme and host, drops ``www.``, the fragment, default ports
+    and tracking parameters (global ones plus ``HOST_TRACKING_PARAMS`` for
+    the host), and sorts the remaining query parameters. With
+    ``drop_timestamps`` playback positions on video hosts (``?t=90``, see
+    ``HOST_TIMESTAMP_PARAMS``) are dropped as well.
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+    if not parts.scheme or not parts.netloc:
+        return url.strip()
+
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    netloc = host
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and not (parts.scheme == "http" and port == 80) and not (parts.scheme == "https" and port == 443):
+        netloc = f"{host}:{port}"
+
+    host_params = _host_params(HOST_TRACKING_PARAMS, host)
+    timestamps = _host_params(HOST_TIMESTAMP_PARAMS, host) if drop_timestamps else set()
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking(k, host_params) and k.lower() not in timestamps
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), netloc, path, urlencode(query), ""))
+
+
+def domain_of(url: str) -> str:
+    """Return the lowercased host of a URL without ``www.``."""
+    try:
+        host = (urlsplit(url).hostname or "").lower()
+    except ValueError:
+        return ""
+    return host[4:] if host.startswith("www.") else host